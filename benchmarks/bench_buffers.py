@@ -0,0 +1,100 @@
+"""
+Before/after measurement for the frame buffer pool.
+
+Runs the OCR preprocessing and template-matching stages on a synthetic
+BGRA frame the size of our ultrawide monitor and prints per-iteration
+latency and the peak memory newly allocated per iteration as seen by
+tracemalloc, for three pipelines:
+
+    before   the stages as they ran before the pool: a copied capture,
+             BGRA -> BGR, gray, 2x upscale and a fixed 180 threshold for
+             OCR, a full-resolution BGR matchTemplate, gc.collect() per lookup
+    no pool  today's stages (gray straight from BGRA, profile preprocessing,
+             pyramid matcher) with fresh arrays instead of pooled buffers
+    after    today's stages through core.buffers.frame_buffers
+
+"no pool" vs "after" is the pool's own effect; "before" also includes the
+stage changes made since.
+
+    python -m benchmarks.bench_buffers [--iterations 20] [--width 2303] [--height 1295]
+"""
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+import cv2
+import numpy as np
+from core.ocr import preprocess_image
+from core.matcher import match_templates, to_gray
+from core.buffers import frame_buffers
+
+TEMPLATE_PATH = "assets/click_download.png"
+
+def _fresh_buffer(tag, shape, dtype=np.uint8):
+    return np.empty(shape, dtype=dtype)
+
+def iteration(frame, template, monitor):
+    # Same stages as OcrFrameBus.capture_once and locate_images_on_screen
+    image = cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY, dst=frame_buffers.get("capture_gray", frame.shape[:2]))
+    thresh = preprocess_image(image)
+    match_templates(to_gray(frame, "match_gray"), {"template": template}, monitor, 0.8, lambda msg: None)
+    return thresh
+
+def unpooled_iteration(frame, template, monitor):
+    """Today's stages with a fresh array wherever the pool would hand out a buffer."""
+    pooled_get = frame_buffers.get
+    frame_buffers.get = _fresh_buffer
+    try:
+        return iteration(frame, template, monitor)
+    finally:
+        frame_buffers.get = pooled_get
+
+def legacy_iteration(frame, template, monitor):
+    """The stages as they ran before the pool, with a full GC per lookup."""
+    screenshot = np.array(frame)
+    image = cv2.cvtColor(screenshot, cv2.COLOR_BGRA2BGR)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    upscaled = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
+    _, thresh = cv2.threshold(upscaled, 180, 255, cv2.THRESH_BINARY)
+    screenshot = cv2.cvtColor(np.array(frame), cv2.COLOR_BGRA2BGR)
+    cv2.minMaxLoc(cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED))
+    gc.collect()
+    return thresh
+
+def measure(label, func, frame, template, monitor, iterations):
+    func(frame, template, monitor)  # Warm-up: fills the buffer pool and the scale cache
+    latencies, peaks = [], []
+    tracemalloc.start()
+    for _ in range(iterations):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        func(frame, template, monitor)
+        latencies.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    print(f"{label:<8} latency mean {statistics.mean(latencies) * 1000:8.1f} ms  "
+          f"p95 {sorted(latencies)[int(len(latencies) * 0.95) - 1] * 1000:8.1f} ms  "
+          f"new allocations per iteration {statistics.mean(peaks) / 1e6:7.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--width", type=int, default=2303)
+    parser.add_argument("--height", type=int, default=1295)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frame = cv2.GaussianBlur(rng.integers(0, 255, (args.height, args.width, 4), dtype=np.uint8), (7, 7), 0)
+    template = cv2.imread(TEMPLATE_PATH, cv2.IMREAD_COLOR)
+    frame[600:600 + template.shape[0], 900:900 + template.shape[1], :3] = template
+    monitor = {"left": 0, "top": 0, "width": args.width, "height": args.height}
+
+    print(f"Frame {args.width}x{args.height}, {args.iterations} iterations")
+    measure("before", legacy_iteration, frame, template, monitor, args.iterations)
+    measure("no pool", unpooled_iteration, frame, template, monitor, args.iterations)
+    measure("after", iteration, frame, template, monitor, args.iterations)
+
+if __name__ == "__main__":
+    main()
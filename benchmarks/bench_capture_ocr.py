@@ -0,0 +1,157 @@
+"""
+Capture-to-OCR copy and latency comparison.
+
+Runs a stored screenshot, wrapped as an mss-style grab (raw BGRA buffer),
+through the previous OCR input path and the current one, and reports per
+stage the median latency, the bytes the stage writes, and the memory it
+newly allocates (tracemalloc):
+
+    previous                                  current
+    capture    np.array(grab) copy            np.frombuffer view of grab.raw
+    convert    BGRA -> BGR                    BGRA -> gray
+    preprocess BGR -> gray, 2x, threshold     2x, threshold
+    handoff    PIL image, then a temp PNG     raw pixels: PGM on stdin
+               (pytesseract) or in-memory     (pytesseract) or SetImageBytes
+               BMP (tesserocr SetImage)       (tesserocr)
+    ocr        the engine, when available     the engine, when available
+
+Headless; the ocr stage is skipped if no Tesseract engine is installed.
+
+    python -m benchmarks.bench_capture_ocr [--frame image.png] [--repeat 20]
+"""
+import io
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+import cv2
+import numpy as np
+from PIL import Image
+from core.capture import frame_pixels
+from core.buffers import frame_buffers, scaled_shape
+from core.ocr import preprocess_image
+from core.ocr_engine import get_ocr_engine
+from core.logger import logger
+from benchmarks.bench_pipeline import ocr_available
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class FakeShot:
+    """Just enough of mss' ScreenShot: a raw BGRA bytearray, its size, and the array interface."""
+
+    def __init__(self, bgra):
+        self.height, self.width = bgra.shape[:2]
+        self.raw = bytearray(bgra.tobytes())
+
+    @property
+    def __array_interface__(self):
+        return {"version": 3, "shape": (self.height, self.width, 4), "typestr": "|u1", "data": self.raw}
+
+def previous_preprocess(image):
+    """preprocess_image as it was before the gray capture path: always starts from colour."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY, dst=frame_buffers.get("ocr_gray", image.shape[:2]))
+    up_shape = scaled_shape(gray.shape, 2, 2)
+    upscaled = cv2.resize(gray, (up_shape[1], up_shape[0]), dst=frame_buffers.get("ocr_upscaled", up_shape),
+                          interpolation=cv2.INTER_CUBIC)
+    _, thresh = cv2.threshold(upscaled, 180, 255, cv2.THRESH_BINARY, dst=frame_buffers.get("ocr_thresh", up_shape))
+    return thresh
+
+def previous_handoff(processed, engine_name):
+    image = Image.fromarray(processed)
+    if engine_name == "tesserocr":
+        buf = io.BytesIO()
+        image.save(buf, format="BMP")  # What tesserocr's SetImage does with a PIL image
+        return buf.getvalue()
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
+        path = f.name
+    try:
+        image.save(path, format="PNG")  # What pytesseract does before launching tesseract
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+def current_handoff(processed, engine_name):
+    height, width = processed.shape[:2]
+    if engine_name == "tesserocr":
+        return np.ascontiguousarray(processed).tobytes()
+    pgm = bytearray(b"P5\n%d %d\n255\n" % (width, height))
+    pgm += np.ascontiguousarray(processed).data
+    return pgm
+
+class Stage:
+    def __init__(self):
+        self.times = []
+        self.bytes_out = 0
+        self.alloc = 0
+
+    def run(self, func, *args):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = func(*args)
+        self.times.append(time.perf_counter() - start)
+        self.alloc = max(self.alloc, tracemalloc.get_traced_memory()[1] - base)
+        # A view (frombuffer) writes nothing; pooled and fresh arrays count in full
+        self.bytes_out = (result.nbytes if result.flags.owndata else 0) if isinstance(result, np.ndarray) else len(result) if isinstance(result, (bytes, bytearray)) else 0
+        return result
+
+def run_path(name, shot, engine, repeat, with_ocr):
+    stages = {s: Stage() for s in ("capture", "convert", "preprocess", "handoff", "ocr")}
+    for _ in range(repeat):
+        if name == "previous":
+            screenshot = stages["capture"].run(np.array, shot)
+            image = stages["convert"].run(lambda s: cv2.cvtColor(s, cv2.COLOR_BGRA2BGR, dst=frame_buffers.get("capture_bgr", s.shape[:2] + (3,))), screenshot)
+            processed = stages["preprocess"].run(previous_preprocess, image)
+            stages["handoff"].run(previous_handoff, processed, engine.name)
+            if with_ocr:
+                stages["ocr"].run(lambda p: engine.image_to_data(Image.fromarray(p)) and b"", processed)
+        else:
+            screenshot = stages["capture"].run(frame_pixels, shot)
+            image = stages["convert"].run(lambda s: cv2.cvtColor(s, cv2.COLOR_BGRA2GRAY, dst=frame_buffers.get("capture_gray", s.shape[:2])), screenshot)
+            processed = stages["preprocess"].run(preprocess_image, image)
+            stages["handoff"].run(current_handoff, processed, engine.name)
+            if with_ocr:
+                stages["ocr"].run(lambda p: engine.image_to_data(p) and b"", processed)
+    return {s: st for s, st in stages.items() if st.times}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frame", default=os.path.join(ROOT, "image.png"))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    bgr = cv2.imread(args.frame, cv2.IMREAD_COLOR)
+    if bgr is None:
+        print(f"❌ Cannot read {args.frame}")
+        return 1
+    shot = FakeShot(cv2.cvtColor(bgr, cv2.COLOR_BGR2BGRA))
+    engine = get_ocr_engine()
+    with_ocr = ocr_available()
+    print(f"Frame {shot.width}x{shot.height}, engine {engine.name}" + ("" if with_ocr else " (not installed, ocr stage skipped)"))
+
+    tracemalloc.start()
+    run_path("previous", shot, engine, 1, False)  # Fill the buffer pools for both paths
+    run_path("current", shot, engine, 1, False)
+    results = {name: run_path(name, shot, engine, max(1, args.repeat), with_ocr) for name in ("previous", "current")}
+    tracemalloc.stop()
+
+    print(f"{'stage':<11}{'prev ms':>9}{'cur ms':>9}{'prev MB written':>17}{'cur MB written':>16}{'prev MB alloc':>15}{'cur MB alloc':>14}")
+    totals = {"previous": 0.0, "current": 0.0}
+    for stage in results["previous"]:
+        prev, cur = results["previous"][stage], results["current"][stage]
+        p, c = statistics.median(prev.times) * 1000, statistics.median(cur.times) * 1000
+        totals["previous"] += p
+        totals["current"] += c
+        print(f"{stage:<11}{p:>9.2f}{c:>9.2f}{prev.bytes_out / 1e6:>17.2f}{cur.bytes_out / 1e6:>16.2f}"
+              f"{prev.alloc / 1e6:>15.2f}{cur.alloc / 1e6:>14.2f}")
+    print(f"{'total':<11}{totals['previous']:>9.2f}{totals['current']:>9.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Offline replay benchmark for the OCR and template-matching pipelines.
+
+Replays a labeled corpus of stored screenshots (benchmarks/corpus.json by
+default) through the same stages the scan loops run on live captures:
+
+    regions     core.text_regions.propose_text_regions + build_mosaic, the
+                text-region proposals the OCR frame bus runs with
+                "text_regions" on (--full-frame skips them and OCRs whole
+                frames, the default in the app; compare the two for recall)
+    preprocess  core.ocr.preprocess_image, with the profile measured once per
+                frame as the frame bus caches it per monitor (--default-profile
+                keeps the fixed 2x upscale)
+    ocr         core.ocr.get_ocr_text_and_confidence
+    match       core.matcher.match_templates on templates from the registry,
+                i.e. what locate_image_on_screen does after its grab
+
+and reports per stage: throughput, latency p50/p95/p99, peak traced memory,
+and detection precision/recall against the corpus labels, plus the share of
+frame pixels that reached OCR. Runs headless; no
+display, mss or pyautogui needed. The OCR stages are skipped if no Tesseract
+engine is available.
+
+    python -m benchmarks.bench_pipeline [--repeat 5] [--full-frame] [--default-profile] [--json out.json] [--compare baseline.json]
+
+Corpus format: {"templates": {name: path}, "phrases": [...], "frames":
+[{"path": ..., "templates": [names present], "phrases": [phrases present]}]}.
+Paths are relative to the repository root.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tracemalloc
+import cv2
+import numpy as np
+from core.ocr import preprocess_image, get_ocr_text_and_confidence, measure_profile, DEFAULT_PROFILE
+from core.text_regions import propose_text_regions, build_mosaic
+from core.ocr_engine import get_ocr_engine
+from core.matcher import match_templates
+from core.templates import template_registry
+from core.logger import logger
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CORPUS = os.path.join(ROOT, "benchmarks", "corpus.json")
+MATCH_CONFIDENCE = 0.8   # Same threshold the app passes to find_and_handle_reference_images
+OCR_MIN_CONFIDENCE = 50  # Same rule as the OCR scanners
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.peak_bytes = 0
+        self.tp = self.fp = self.fn = 0
+
+    def run(self, func, *args):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = func(*args)
+        self.latencies.append(time.perf_counter() - start)
+        self.peak_bytes = max(self.peak_bytes, tracemalloc.get_traced_memory()[1] - base)
+        return result
+
+    def score(self, predicted, expected, universe):
+        for label in universe:
+            if label in predicted and label in expected:
+                self.tp += 1
+            elif label in predicted:
+                self.fp += 1
+            elif label in expected:
+                self.fn += 1
+
+    def summary(self):
+        total = sum(self.latencies)
+        summary = {
+            "runs": len(self.latencies),
+            "throughput_per_s": len(self.latencies) / total if total else 0.0,
+            "p50_ms": percentile(self.latencies, 50) * 1000,
+            "p95_ms": percentile(self.latencies, 95) * 1000,
+            "p99_ms": percentile(self.latencies, 99) * 1000,
+            "peak_mb": self.peak_bytes / 1e6,
+        }
+        if self.tp + self.fp + self.fn:
+            summary["precision"] = self.tp / (self.tp + self.fp) if self.tp + self.fp else 0.0
+            summary["recall"] = self.tp / (self.tp + self.fn) if self.tp + self.fn else 0.0
+        return summary
+
+def ocr_available():
+    engine = get_ocr_engine()
+    if engine.name != "pytesseract":
+        return True
+    import pytesseract
+    return shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        corpus = json.load(f)
+    frames = []
+    for entry in corpus["frames"]:
+        image = cv2.imread(os.path.join(ROOT, entry["path"]), cv2.IMREAD_COLOR)
+        if image is None:
+            print(f"⚠️ Skipping unreadable frame {entry['path']}")
+            continue
+        frames.append((entry, cv2.cvtColor(image, cv2.COLOR_BGR2BGRA)))
+    return corpus, frames
+
+def propose_and_pack(gray):
+    """What OcrFrameBus does with text_regions on: None means OCR the whole frame, an empty list means skip OCR."""
+    regions = propose_text_regions(gray)
+    if not regions:
+        return regions
+    return build_mosaic(gray, regions)
+
+def run_benchmark(corpus, frames, repeat, with_ocr, text_regions=True, profiles=True):
+    stages = {name: StageStats(name) for name in ("regions", "preprocess", "ocr", "match")}
+    pixels = {"frame": 0, "ocr": 0, "processed": 0}
+    measured = {}
+    templates = corpus["templates"]
+    phrases = [p.upper() for p in corpus["phrases"]]
+    quiet = lambda msg: None
+
+    tracemalloc.start()
+    for _ in range(repeat):
+        for entry, frame in frames:
+            height, width = frame.shape[:2]
+            monitor = {"left": 0, "top": 0, "width": width, "height": height}
+
+            fitted = {name: template_registry.get(os.path.join(ROOT, path), monitor, quiet)
+                      for name, path in templates.items()}
+            fitted = {name: t for name, t in fitted.items() if t is not None}
+            hits = stages["match"].run(match_templates, frame, fitted, monitor, MATCH_CONFIDENCE, quiet)
+            stages["match"].score({name for name, hit in hits.items() if hit}, set(entry.get("templates", [])), templates)
+
+            image = cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY)
+            pixels["frame"] += image.size
+            if entry["path"] not in measured:
+                measured[entry["path"]] = measure_profile(image)[0] if profiles else DEFAULT_PROFILE
+            profile = measured[entry["path"]]
+            if text_regions:
+                mosaic = stages["regions"].run(propose_and_pack, image)
+                if mosaic is not None:
+                    image = mosaic
+            if not isinstance(image, np.ndarray):
+                continue  # No text-like regions: the frame bus skips OCR
+            pixels["ocr"] += image.size
+            pixels["processed"] += int(image.size * profile.scale ** 2)
+            if not with_ocr:
+                continue
+            processed = stages["preprocess"].run(preprocess_image, image, profile)
+            text, conf = stages["ocr"].run(get_ocr_text_and_confidence, processed)
+            found = {p for p in phrases if p in text.upper() and conf > OCR_MIN_CONFIDENCE}
+            stages["ocr"].score(found, {p.upper() for p in entry.get("phrases", [])}, phrases)
+    tracemalloc.stop()
+    results = {name: stage.summary() for name, stage in stages.items() if stage.latencies}
+    if pixels["frame"]:
+        results["ocr_pixel_share"] = pixels["ocr"] / pixels["frame"]
+        results["processed_pixel_share"] = pixels["processed"] / pixels["frame"]
+    return results
+
+def print_report(results, baseline=None):
+    header = f"{'stage':<11}{'runs':>6}{'fps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak MB':>9}{'prec':>7}{'recall':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, s in results.items():
+        if not isinstance(s, dict):
+            continue
+        line = (f"{name:<11}{s['runs']:>6}{s['throughput_per_s']:>9.2f}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}"
+                f"{s['p99_ms']:>10.1f}{s['peak_mb']:>9.1f}")
+        if "precision" in s:
+            line += f"{s['precision']:>7.2f}{s['recall']:>8.2f}"
+        print(line)
+        if baseline and name in baseline:
+            b = baseline[name]
+            deltas = [f"p50 {_delta(s['p50_ms'], b['p50_ms'])}", f"p95 {_delta(s['p95_ms'], b['p95_ms'])}"]
+            if "recall" in s and "recall" in b:
+                deltas.append(f"precision {s['precision'] - b['precision']:+.2f}")
+                deltas.append(f"recall {s['recall'] - b['recall']:+.2f}")
+            print(f"{'':<11}vs baseline: " + ", ".join(deltas))
+    if "ocr_pixel_share" in results:
+        line = f"Pixels reaching OCR: {results['ocr_pixel_share'] * 100:.1f}% of captured"
+        if baseline and "ocr_pixel_share" in baseline:
+            line += f" (baseline {baseline['ocr_pixel_share'] * 100:.1f}%)"
+        line += f", {results['processed_pixel_share'] * 100:.1f}% after preprocessing"
+        if baseline and "processed_pixel_share" in baseline:
+            line += f" (baseline {baseline['processed_pixel_share'] * 100:.1f}%)"
+        print(line)
+
+def _delta(current, previous):
+    if not previous:
+        return "n/a"
+    return f"{(current - previous) / previous * 100:+.1f}%"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-ocr", action="store_true", help="Skip the preprocess/ocr stages")
+    parser.add_argument("--full-frame", action="store_true", help="OCR whole frames, without text-region proposals")
+    parser.add_argument("--default-profile", action="store_true", help="Preprocess with the fixed 2x upscale, not measured profiles")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Print deltas against results saved earlier with --json")
+    parser.add_argument("--verbose", action="store_true", help="Keep the app's DEBUG logging on while timing")
+    args = parser.parse_args()
+    if not args.verbose:
+        logger.setLevel(logging.WARNING)
+
+    corpus, frames = load_corpus(args.corpus)
+    if not frames:
+        print("❌ No readable frames in corpus")
+        return 1
+    with_ocr = not args.no_ocr and ocr_available()
+    if not args.no_ocr and not with_ocr:
+        print("⚠️ No Tesseract engine available, skipping preprocess/ocr stages")
+
+    # One untimed pass fills the template registry, buffer pool and scale cache
+    run_benchmark(corpus, frames, 1, with_ocr, not args.full_frame, not args.default_profile)
+    results = run_benchmark(corpus, frames, args.repeat, with_ocr, not args.full_frame, not args.default_profile)
+
+    try:
+        import resource
+        max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        max_rss_mb = None
+    print(f"Corpus {os.path.relpath(args.corpus, ROOT)}: {len(frames)} frames x {args.repeat} repeats, "
+          f"Python {platform.python_version()}, OpenCV {cv2.__version__}, NumPy {np.__version__}"
+          + (f", max RSS {max_rss_mb:.0f} MB" if max_rss_mb else ""))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["stages"]
+    print_report(results, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"timestamp": time.time(), "frames": len(frames), "repeat": args.repeat, "stages": results}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
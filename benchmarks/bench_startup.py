@@ -0,0 +1,130 @@
+"""
+Startup-time benchmark for the GUI.
+
+Launches the app the way main.py does in fresh interpreter processes and
+reports, per run:
+
+    import      importing ui_mainwindow (everything main.py imports)
+    window      import + QApplication + AutoClickerApp() + show(), up to the
+                first pass of the event loop after the window was shown
+    process     wall time of the whole child process, interpreter start included
+
+and which heavy modules (cv2, numpy, pytesseract, pyautogui, mss, PIL) were
+already loaded when the window appeared. Runs headless with the Qt
+offscreen platform; the update check is pointed at a closed local port.
+
+    python -m benchmarks.bench_startup [--runs 5] [--importtime] [--json out.json] [--compare baseline.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("cv2", "numpy", "pytesseract", "pyautogui", "mss", "PIL", "core.clicker", "core.ocr")
+
+CHILD = r"""
+import time
+start = time.perf_counter()
+import sys, json
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
+import ui_mainwindow
+imported = time.perf_counter()
+app = QApplication(sys.argv)
+window = ui_mainwindow.AutoClickerApp()
+window.show()
+result = {"loaded": [m for m in HEAVY_MODULES if m in sys.modules]}
+def first_frame():
+    result["import_s"] = imported - start
+    result["window_s"] = time.perf_counter() - start
+    app.quit()
+QTimer.singleShot(0, first_frame)
+app.exec()
+with open(RESULT_PATH, "w") as f:  # Not stdout: the app's log lines go there from other threads
+    json.dump(result, f)
+"""
+
+def run_once(importtime=False):
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    env["AUTOCLICKER_UPDATE_URL"] = "http://127.0.0.1:9/update.json"  # Fails fast, never reaches the network
+    args = [sys.executable]
+    if importtime:
+        args += ["-X", "importtime"]
+    with tempfile.TemporaryDirectory() as tmp:
+        result_path = os.path.join(tmp, "result.json")
+        args += ["-c", f"HEAVY_MODULES = {HEAVY_MODULES!r}\nRESULT_PATH = {result_path!r}\n" + CHILD]
+        start = time.perf_counter()
+        proc = subprocess.run(args, cwd=ROOT, env=env, capture_output=True, text=True, encoding="utf-8", errors="replace")
+        elapsed = time.perf_counter() - start
+        if proc.returncode != 0 or not os.path.exists(result_path):
+            raise RuntimeError(f"Startup run failed (exit code {proc.returncode}):\n{proc.stderr[-2000:]}")
+        with open(result_path) as f:
+            result = json.load(f)
+    result["process_s"] = elapsed
+    return result, proc.stderr
+
+def top_imports(stderr, count=15):
+    """Slowest top-level imports from -X importtime output, as (cumulative seconds, module)."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue  # Nested import, or the header line
+        imports.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+def summarize(runs):
+    summary = {}
+    for key in ("import_s", "window_s", "process_s"):
+        values = [r[key] for r in runs]
+        summary[key] = {"median": statistics.median(values), "min": min(values), "max": max(values)}
+    summary["loaded"] = runs[-1]["loaded"]
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true", help="Also list the slowest top-level imports")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Print deltas against results saved earlier with --json")
+    args = parser.parse_args()
+
+    run_once()  # Warm the OS file cache and __pycache__ so the timed runs are comparable
+    runs = [run_once()[0] for _ in range(max(1, args.runs))]
+    summary = summarize(runs)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["summary"]
+    print(f"{len(runs)} runs, Python {sys.version.split()[0]}")
+    print(f"{'':<10}{'median ms':>11}{'min ms':>9}{'max ms':>9}")
+    for key, label in (("import_s", "import"), ("window_s", "window"), ("process_s", "process")):
+        s = summary[key]
+        line = f"{label:<10}{s['median'] * 1000:>11.1f}{s['min'] * 1000:>9.1f}{s['max'] * 1000:>9.1f}"
+        if baseline and key in baseline and baseline[key]["median"]:
+            line += f"   vs baseline {(s['median'] - baseline[key]['median']) / baseline[key]['median'] * 100:+.1f}%"
+        print(line)
+    print("Heavy modules loaded at first window: " + (", ".join(summary["loaded"]) or "none"))
+
+    if args.importtime:
+        _, stderr = run_once(importtime=True)
+        print("\nSlowest top-level imports (cumulative ms):")
+        for seconds, name in top_imports(stderr):
+            print(f"{seconds * 1000:>9.1f}  {name}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"timestamp": time.time(), "runs": runs, "summary": summary}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Compile gui.ui into gui_ui.py with pyuic6 so the app doesn't parse the XML
+at every launch. The generated module records the SHA-256 of the gui.ui it
+was built from; ui_mainwindow only uses it while that still matches, and
+falls back to uic.loadUi otherwise. Rerun after every change to gui.ui:
+
+    python build_ui.py [--check]
+"""
+import io
+import os
+import sys
+import hashlib
+import argparse
+from PyQt6 import uic
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+UI_FILE = "gui.ui"     # Relative to ROOT, which is also how pyuic names it in the generated header
+OUT_FILE = "gui_ui.py"
+
+def ui_file_hash(path=UI_FILE):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def build(ui_path=UI_FILE, out_path=OUT_FILE):
+    source = io.StringIO()
+    with open(ui_path, encoding="utf-8") as f:
+        uic.compileUi(f, source)
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(source.getvalue())
+        f.write(f"\n\n# SHA-256 of the gui.ui this module was generated from, checked by ui_mainwindow\nGUI_UI_SHA256 = \"{ui_file_hash(ui_path)}\"\n")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="Only report whether gui_ui.py is up to date")
+    args = parser.parse_args()
+    os.chdir(ROOT)
+    if args.check:
+        sys.path.insert(0, ROOT)
+        try:
+            import gui_ui
+            current = gui_ui.GUI_UI_SHA256 == ui_file_hash()
+        except (ImportError, AttributeError):
+            current = False
+        print("✅ gui_ui.py is up to date" if current else "❌ gui_ui.py is missing or stale, run python build_ui.py")
+        return 0 if current else 1
+    build()
+    print(f"✅ Wrote {OUT_FILE} from {UI_FILE}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
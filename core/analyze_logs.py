@@ -1,18 +1,52 @@
 import ollama
 import os
+import json
 import time
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 LOG_FILE = "C:/Users/regis/Documents/AutoClickerLogs/autoclicker.log"
+CHUNK_LINES = 400        # Log lines per chunk summary
+CHUNK_CHARS = 24000      # Hard cap per chunk, keeps one prompt well inside the model's context
+REDUCE_FANOUT = 12       # Partial summaries merged per reduce prompt
+CACHE_VERSION = 1        # Bump when the prompts change so old summaries aren't reused
 
-def list_models():
+CHUNK_PROMPT = (
+    "You are analyzing automation performance logs from an auto-clicker app.\n"
+    "Below is one consecutive excerpt of a longer log. Summarize it as short bullet points with counts:\n"
+    "- Scan cycles or iterations\n"
+    "- Clicks performed\n"
+    "- Detections (phrases or images found) and their confidence\n"
+    "- Errors and warnings, with the distinct messages\n"
+    "- First and last timestamp of the excerpt\n\n"
+    "Log excerpt:\n\n"
+)
+REDUCE_PROMPT = (
+    "You are analyzing automation performance logs from an auto-clicker app.\n"
+    "Below are summaries of consecutive parts of one log, in order. Combine them into one report:\n"
+    "- Number of scan cycles\n"
+    "- Number of clicks performed\n"
+    "- Click success or failure indications\n"
+    "- Errors if any\n"
+    "- Overall reliability (brief analysis)\n\n"
+    "Add up counts across parts instead of repeating them.\n\n"
+)
+
+def get_client(host=None):
+    """Ollama client for host (e.g. http://127.0.0.1:11434); defaults to OLLAMA_HOST or the local server."""
+    return ollama.Client(host=host or os.environ.get("OLLAMA_HOST"))
+
+def list_models(client=None):
     try:
-        return ollama.list().models
+        return (client or get_client()).list().models
     except Exception as e:
         print(f"❌ Failed to fetch models from Ollama: {e}")
         return []
 
-def select_model():
-    models = list_models()
+def select_model(client=None):
+    models = list_models(client)
     if not models:
         print("❌ No models available.")
         return None
@@ -30,15 +64,136 @@ def select_model():
             pass
         print("❗Invalid choice. Try again.")
 
-def read_logs():
-    if not os.path.exists(LOG_FILE):
-        print(f"❌ Log file not found: {LOG_FILE}")
+def read_logs(log_file=LOG_FILE):
+    if not os.path.exists(log_file):
+        print(f"❌ Log file not found: {log_file}")
         return ""
-    
-    with open(LOG_FILE, 'r', encoding='utf-8', errors='ignore') as file:
+
+    with open(log_file, 'r', encoding='utf-8', errors='ignore') as file:
         return file.read()
 
-def summarize_logs(model_name, log_content):
+def iter_log_chunks(log_file=LOG_FILE, chunk_lines=CHUNK_LINES, chunk_chars=CHUNK_CHARS):
+    """
+    Stream the log as chunks of at most chunk_lines lines / chunk_chars
+    characters without reading the whole file. Chunk boundaries only depend
+    on the lines before them, so a log that has grown since the last run
+    yields the same leading chunks and only new ones at the end.
+    """
+    lines, size = [], 0
+    with open(log_file, 'r', encoding='utf-8', errors='ignore') as file:
+        for line in file:
+            if len(line) > chunk_chars:
+                line = line[:chunk_chars - 1] + "\n"
+            if lines and (len(lines) >= chunk_lines or size + len(line) > chunk_chars):
+                yield "".join(lines)
+                lines, size = [], 0
+            lines.append(line)
+            size += len(line)
+    if lines:
+        yield "".join(lines)
+
+class SummaryCache:
+    """Chunk summaries on disk, keyed by a hash of the model, prompt version and chunk text."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.hits = 0
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as file:
+                    self.entries = json.load(file)
+            except Exception as e:
+                print(f"⚠️ Ignoring unreadable summary cache {path}: {e}")
+
+    @staticmethod
+    def key(model_name, kind, text):
+        digest = hashlib.sha256(f"{CACHE_VERSION}\0{model_name}\0{kind}\0".encode("utf-8"))
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            summary = self.entries.get(key)
+            if summary is not None:
+                self.hits += 1
+            return summary
+
+    def put(self, key, summary):
+        with self._lock:
+            self.entries[key] = summary
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(self.entries, file)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"⚠️ Failed to save summary cache {self.path}: {e}")
+
+def default_cache_path(log_file):
+    return os.path.join(os.path.dirname(os.path.abspath(log_file)), "analyze_logs_cache.json")
+
+def _chat(client, model_name, prompt):
+    response = client.chat(model=model_name, messages=[
+        {"role": "user", "content": prompt}
+    ])
+    return response['message']['content']
+
+def _summarize_cached(client, model_name, cache, kind, prompt, text):
+    key = cache.key(model_name, kind, text)
+    summary = cache.get(key)
+    if summary is None:
+        summary = _chat(client, model_name, prompt + text)
+        cache.put(key, summary)
+    return summary
+
+def reduce_summaries(client, model_name, summaries, cache):
+    """Merge partial summaries REDUCE_FANOUT at a time until one report is left."""
+    while len(summaries) > 1:
+        groups = [summaries[i:i + REDUCE_FANOUT] for i in range(0, len(summaries), REDUCE_FANOUT)]
+        summaries = [
+            _summarize_cached(client, model_name, cache, "reduce", REDUCE_PROMPT,
+                              "\n\n".join(f"Part {i + 1}:\n{s}" for i, s in enumerate(group)))
+            for group in groups
+        ]
+    return summaries[0] if summaries else ""
+
+def summarize_logs_chunked(model_name, log_file=LOG_FILE, client=None, workers=1, cache_path=None,
+                           chunk_lines=CHUNK_LINES, chunk_chars=CHUNK_CHARS):
+    """
+    Map-reduce summary of log_file: every chunk from iter_log_chunks() is
+    summarized on its own (on `workers` threads), then the partial summaries
+    are reduced into one report. Chunk summaries are cached in cache_path, so
+    a rerun only sends chunks the model hasn't seen. Returns the report.
+    """
+    client = client or get_client()
+    cache = SummaryCache(cache_path)
+    start = time.time()
+    chunks = list(iter_log_chunks(log_file, chunk_lines, chunk_chars))
+    if not chunks:
+        print("⚠️ Log file is empty.")
+        return ""
+
+    print(f"\n📡 Summarizing {len(chunks)} chunks with model '{model_name}' on {workers} worker(s)...")
+    summarize = lambda chunk: _summarize_cached(client, model_name, cache, "chunk", CHUNK_PROMPT, chunk)
+    try:
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                summaries = list(pool.map(summarize, chunks))
+        else:
+            summaries = [summarize(chunk) for chunk in chunks]
+        report = reduce_summaries(client, model_name, summaries, cache)
+    finally:
+        cache.save()  # Keep finished chunks even if a later one failed
+    print(f"✅ {len(chunks)} chunks, {cache.hits} cached summaries reused, {time.time() - start:.1f}s")
+    return report
+
+def summarize_logs(model_name, log_content, client=None):
     if not log_content.strip():
         print("⚠️ Log file is empty.")
         return
@@ -58,22 +213,44 @@ def summarize_logs(model_name, log_content):
 
     print(f"\n📡 Sending logs to model '{model_name}'...")
     try:
-        response = ollama.chat(model=model_name, messages=[
-            {"role": "user", "content": prompt}
-        ])
         print("\n🧠 Analysis from model:\n")
-        print(response['message']['content'])
+        print(_chat(client or get_client(), model_name, prompt))
 
     except Exception as e:
         print(f"❌ Failed to generate response: {e}")
 
 def main():
-    model_name = select_model()
+    parser = argparse.ArgumentParser(description="Summarize auto-clicker logs with a local Ollama model.")
+    parser.add_argument("--log", default=LOG_FILE, help="Log file to analyze")
+    parser.add_argument("--model", help="Model name; asks interactively if omitted")
+    parser.add_argument("--host", help="Ollama server URL, e.g. a local stand-in (default: OLLAMA_HOST)")
+    parser.add_argument("--workers", type=int, default=1, help="Chunks summarized in parallel")
+    parser.add_argument("--chunk-lines", type=int, default=CHUNK_LINES)
+    parser.add_argument("--cache", help="Chunk summary cache file (default: next to the log)")
+    parser.add_argument("--no-cache", action="store_true", help="Summarize every chunk again")
+    parser.add_argument("--whole", action="store_true", help="Send the whole log in one prompt (old behaviour)")
+    args = parser.parse_args()
+
+    client = get_client(args.host)
+    model_name = args.model or select_model(client)
     if not model_name:
         return
 
-    log_content = read_logs()
-    summarize_logs(model_name, log_content)
+    if args.whole:
+        summarize_logs(model_name, read_logs(args.log), client)
+        return
+    if not os.path.exists(args.log):
+        print(f"❌ Log file not found: {args.log}")
+        return
+    cache_path = None if args.no_cache else (args.cache or default_cache_path(args.log))
+    try:
+        report = summarize_logs_chunked(model_name, args.log, client, max(1, args.workers), cache_path,
+                                        chunk_lines=max(1, args.chunk_lines))
+    except Exception as e:
+        print(f"❌ Failed to generate response: {e}")
+        return
+    print("\n🧠 Analysis from model:\n")
+    print(report)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,50 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+
+MAX_BUFFERS_PER_THREAD = 16  # Oldest buffers are dropped past this, bounding memory per thread
+
+class FrameBufferPool:
+    """
+    Preallocated arrays keyed by (tag, shape, dtype) that OpenCV calls can
+    write into through their dst argument, so the scan loops stop allocating
+    fresh frame-sized arrays every iteration. Each thread gets its own set of
+    buffers; a buffer is only valid until the same thread asks for that tag
+    and shape again.
+    """
+
+    def __init__(self, max_buffers=MAX_BUFFERS_PER_THREAD):
+        self.max_buffers = max_buffers
+        self._local = threading.local()
+
+    def _buffers(self):
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None:
+            buffers = self._local.buffers = OrderedDict()
+        return buffers
+
+    def get(self, tag, shape, dtype=np.uint8):
+        key = (tag, tuple(shape), np.dtype(dtype).str)
+        buffers = self._buffers()
+        buf = buffers.get(key)
+        if buf is None:
+            buf = np.empty(shape, dtype=dtype)
+            buffers[key] = buf
+            while len(buffers) > self.max_buffers:
+                buffers.popitem(last=False)
+        else:
+            buffers.move_to_end(key)
+        return buf
+
+    def like(self, tag, array):
+        return self.get(tag, array.shape, array.dtype)
+
+    def clear(self):
+        self._buffers().clear()
+
+frame_buffers = FrameBufferPool()
+
+def scaled_shape(shape, fx, fy):
+    """Output shape of cv2.resize(src, None, fx=fx, fy=fy) for a src of shape."""
+    height, width = shape[:2]
+    return (max(1, int(round(height * fy))), max(1, int(round(width * fx)))) + tuple(shape[2:])
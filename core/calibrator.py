@@ -1,7 +1,5 @@
 import time
 import threading
-import pyautogui
-import mss
 from PyQt6.QtCore import pyqtSignal, QObject
 from core.logger import logger
 
@@ -15,6 +13,8 @@ class CalibrationWorker(QObject):
             self.log_signal.emit(f"⏳ {30 - i}s remaining...")
             time.sleep(1)
         try:
+            import pyautogui
+            import mss
             pos = pyautogui.position()
             self.log_signal.emit(f"📍 Mouse position captured at {pos}")
             with mss.mss() as sct:
@@ -0,0 +1,434 @@
+import os
+import json
+import mmap
+import time
+import struct
+import hashlib
+import threading
+from contextlib import contextmanager
+import numpy as np
+from core.logger import logger
+
+RECORD_ENV = "AUTOCLICKER_RECORD"  # Path of an archive to record the session into
+REPLAY_ENV = "AUTOCLICKER_REPLAY"  # Path of an archive to replay instead of the screen
+
+ARCHIVE_MAGIC = b"ACSR0001"
+ARCHIVE_GROWTH = 64 * 1024 * 1024  # The mapping grows by at least this much at a time
+FRAME_TAG = b"FRM1"
+LAYOUT_TAG = b"MON1"
+# tag, timestamp, left, top, width, height, payload offset, payload bytes stored inline, payload digest
+RECORD = struct.Struct("<4sdiiiiQQ16s")
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+def _region_key(region):
+    return (int(region["left"]), int(region["top"]), int(region["width"]), int(region["height"]))
+
+def _scan_records(buf, end):
+    """Yield (position, fields) for every complete record in buf[len(magic):end]."""
+    pos = len(ARCHIVE_MAGIC)
+    while pos + RECORD.size <= end:
+        fields = RECORD.unpack_from(buf, pos)
+        tag, _, _, _, _, _, offset, stored, _ = fields
+        if tag not in (FRAME_TAG, LAYOUT_TAG):
+            break  # Zeroed tail of the mapping, or a record cut short by a crash
+        if stored and offset + stored > end:
+            break
+        yield pos, fields
+        pos += RECORD.size + stored
+
+class SessionRecorder:
+    """
+    Append-only archive of captured frames: timestamp, region and raw BGRA
+    pixels per grab, plus the monitor layout. The file is written through a
+    memory mapping that grows in ARCHIVE_GROWTH steps. A frame identical to
+    one already stored only gets a record pointing at the earlier pixels, so
+    the long stretches where the game screen doesn't change cost a few dozen
+    bytes per grab. Opening an existing archive appends to it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._digests = {}
+        self.frames = 0
+        self.duplicates = 0
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, "r+b" if exists else "w+b")
+        size = os.fstat(self._file.fileno()).st_size
+        if not exists:
+            self._file.write(ARCHIVE_MAGIC)
+            size = len(ARCHIVE_MAGIC)
+        self._capacity = max(size, ARCHIVE_GROWTH)
+        self._file.truncate(self._capacity)
+        self._mm = mmap.mmap(self._file.fileno(), self._capacity)
+        if self._mm[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+            self._mm.close()
+            self._file.close()
+            raise ValueError(f"{path} is not a session archive")
+        self._end = len(ARCHIVE_MAGIC)
+        for pos, fields in _scan_records(self._mm, size):
+            tag, _, _, _, _, _, offset, stored, digest = fields
+            if tag == FRAME_TAG and stored:
+                self._digests[digest] = offset
+            self._end = pos + RECORD.size + stored
+
+    def _reserve(self, size):
+        needed = self._end + size
+        if needed <= self._capacity:
+            return
+        self._capacity = max(needed, self._capacity + ARCHIVE_GROWTH)
+        self._mm.close()  # Windows can't resize a file while it is mapped
+        self._file.truncate(self._capacity)
+        self._mm = mmap.mmap(self._file.fileno(), self._capacity)
+
+    def _append(self, tag, region, payload, digest):
+        left, top, width, height = region
+        stored = 0 if payload is None else len(payload)
+        self._reserve(RECORD.size + stored)
+        pos = self._end
+        offset = self._digests.get(digest, 0) if payload is None else pos + RECORD.size
+        if payload is not None:
+            self._mm[offset:offset + stored] = payload
+        # The header goes in after the payload, so a torn write never looks like a complete record
+        RECORD.pack_into(self._mm, pos, tag, time.time(), left, top, width, height, offset, stored, digest)
+        self._end = pos + RECORD.size + stored
+        return offset
+
+    def write_layout(self, monitors):
+        """Store the monitor list (as in mss' sct.monitors) so replays can enumerate the same monitors."""
+        payload = json.dumps(monitors).encode("utf-8")
+        with self._lock:
+            self._append(LAYOUT_TAG, (0, 0, 0, 0), payload, _digest(payload))
+
+    def write_frame(self, region, pixels):
+        """Append one grab of region; pixels is the height x width x 4 BGRA array."""
+        pixels = np.ascontiguousarray(pixels)
+        height, width = pixels.shape[:2]
+        data = memoryview(pixels).cast("B")
+        digest = _digest(data)
+        key = (int(region["left"]), int(region["top"]), width, height)
+        with self._lock:
+            self.frames += 1
+            if digest in self._digests:
+                self.duplicates += 1
+                self._append(FRAME_TAG, key, None, digest)
+            else:
+                self._digests[digest] = self._append(FRAME_TAG, key, data, digest)
+
+    def close(self):
+        with self._lock:
+            if self._mm is None:
+                return
+            self._mm.flush()
+            self._mm.close()
+            self._mm = None
+            self._file.truncate(self._end)
+            self._file.close()
+        logger.info(f"✅ Session archive {self.path} closed: {self.frames} frames recorded, {self.duplicates} duplicates collapsed")
+
+_recorders = {}
+_recorders_lock = threading.Lock()
+
+def acquire_recorder(path):
+    """Shared recorder for path; the scan threads of one session all append to the same archive."""
+    path = os.path.abspath(path)
+    with _recorders_lock:
+        entry = _recorders.get(path)
+        if entry is None:
+            entry = _recorders[path] = [SessionRecorder(path), 0]
+        entry[1] += 1
+        return entry[0]
+
+def release_recorder(recorder):
+    with _recorders_lock:
+        entry = _recorders.get(recorder.path)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del _recorders[recorder.path]
+            recorder.close()
+
+class RecordingCapture:
+    """Wraps an mss instance and copies every grab into a SessionRecorder."""
+
+    def __init__(self, sct, path):
+        self.sct = sct
+        self.recorder = acquire_recorder(path)
+        self.monitors = sct.monitors
+        self.recorder.write_layout(self.monitors)
+
+    def refresh_monitors(self):
+        """Re-read the monitor list (see current_monitors) and record it again if it changed."""
+        monitors = current_monitors(self.sct)
+        if monitors != self.monitors:
+            self.monitors = monitors
+            self.recorder.write_layout(monitors)
+        return monitors
+
+    def grab(self, monitor):
+        shot = self.sct.grab(monitor)
+        try:
+            self.recorder.write_frame(monitor, np.asarray(shot))
+        except Exception as e:
+            logger.error(f"❌ Failed to record frame for {monitor}: {e}")
+        return shot
+
+    def close(self):
+        release_recorder(self.recorder)
+        self.sct.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ReplayCapture:
+    """
+    Stands in for mss.mss() and serves the frames of a recorded session
+    archive, as fast as the scan loops ask for them (the loops pace
+    themselves by replay_time_scale and speed). grab(region) returns
+    the next recorded frame, after the previous one served, whose region
+    contains the requested one (cropped to it). Once the archive runs out
+    the last matching frame is repeated, or with loop=True the replay starts
+    over. A region no single frame covers, such as the virtual desktop of a
+    session recorded monitor by monitor, is pieced together from the
+    monitors it overlaps. Frames are read-only views into the mapped file.
+    """
+
+    def __init__(self, path, loop=False, speed=0):
+        self.path = path
+        self.loop = loop
+        self.speed = speed
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a session archive")
+        self.frames = []
+        self.monitors = None
+        for _, fields in _scan_records(self._mm, len(self._mm)):
+            tag, timestamp, left, top, width, height, offset, stored, _ = fields
+            if tag == LAYOUT_TAG:
+                if self.monitors is None:
+                    self.monitors = json.loads(self._mm[offset:offset + stored].decode("utf-8"))
+            else:
+                self.frames.append((timestamp, (left, top, width, height), offset))
+        if self.monitors is None:
+            self.monitors = self._layout_from_frames()
+        self._cursor = 0
+        self._last = {}
+        self.exhausted = False
+        logger.info(f"✅ Replaying {len(self.frames)} frames from session archive {path}")
+
+    def _layout_from_frames(self):
+        regions = sorted({region for _, region, _ in self.frames})
+        monitors = [{"left": l, "top": t, "width": w, "height": h} for l, t, w, h in regions]
+        if not monitors:
+            return [{"left": 0, "top": 0, "width": 0, "height": 0}]
+        left = min(m["left"] for m in monitors)
+        top = min(m["top"] for m in monitors)
+        right = max(m["left"] + m["width"] for m in monitors)
+        bottom = max(m["top"] + m["height"] for m in monitors)
+        return [{"left": left, "top": top, "width": right - left, "height": bottom - top}] + monitors
+
+    def _pixels(self, index):
+        _, (_, _, width, height), offset = self.frames[index]
+        return np.frombuffer(self._mm, dtype=np.uint8, count=width * height * 4, offset=offset).reshape(height, width, 4)
+
+    def _find(self, key, start):
+        left, top, width, height = key
+        for index in range(start, len(self.frames)):
+            l, t, w, h = self.frames[index][1]
+            if l <= left and t <= top and left + width <= l + w and top + height <= t + h:
+                return index
+        return None
+
+    def _locate(self, key):
+        """Index of the frame to serve for region key, or None if no recorded frame covers it."""
+        index = self._find(key, self._cursor)
+        if index is None and self.loop:
+            index = self._find(key, 0)
+        if index is None and key in self._last:
+            index = self._last[key]
+            if not self.exhausted:
+                self.exhausted = True
+                logger.info(f"Session archive {self.path} exhausted, repeating the last frame")
+        return index
+
+    def _serve(self, index, key):
+        self._cursor = max(self._cursor, index + 1)
+        self._last[key] = index
+        left, top, width, height = key
+        l, t, _, _ = self.frames[index][1]
+        return self._pixels(index)[top - t:top - t + height, left - l:left - l + width]
+
+    def _compose(self, key):
+        """Piece region key together from the recorded monitors it overlaps; None if none of them has a frame."""
+        left, top, width, height = key
+        canvas = None
+        for m in self.monitors[1:]:
+            x1, y1 = max(left, m["left"]), max(top, m["top"])
+            x2, y2 = min(left + width, m["left"] + m["width"]), min(top + height, m["top"] + m["height"])
+            if x1 >= x2 or y1 >= y2:
+                continue
+            part_key = _region_key(m)
+            index = self._locate(part_key)
+            if index is None:
+                continue
+            part = self._serve(index, part_key)
+            if canvas is None:
+                canvas = np.zeros((height, width, 4), dtype=np.uint8)
+            canvas[y1 - top:y2 - top, x1 - left:x2 - left] = part[y1 - m["top"]:y2 - m["top"], x1 - m["left"]:x2 - m["left"]]
+        return canvas
+
+    def grab(self, monitor):
+        key = _region_key(monitor)
+        index = self._locate(key)
+        if index is not None:
+            return self._serve(index, key)
+        canvas = self._compose(key)
+        if canvas is None:
+            raise ValueError(f"Session archive {self.path} has no frame covering {monitor}")
+        return canvas
+
+    def close(self):
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass  # A frame view is still alive; the mapping is released with it
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_capture(record_path=None, replay_path=None, loop=None, speed=None):
+    """
+    Screen capture for the scan loops, used like mss.mss(). With a replay
+    path frames come from a recorded session archive; with a record path
+    live grabs are also appended to that archive. Without either this is a
+    plain mss instance. Paths not passed in come from AUTOCLICKER_REPLAY /
+    AUTOCLICKER_RECORD, then from the "capture" block in settings.json.
+    """
+    from core.utils import load_capture_settings
+    settings = load_capture_settings()
+    replay_path = replay_path or os.environ.get(REPLAY_ENV) or settings["replay"]
+    record_path = record_path or os.environ.get(RECORD_ENV) or settings["record"]
+    loop = settings["loop"] if loop is None else loop
+    speed = settings["speed"] if speed is None else speed
+    if replay_path:
+        return ReplayCapture(replay_path, loop=loop, speed=speed)
+    import mss
+    sct = mss.mss()
+    if record_path:
+        try:
+            return RecordingCapture(sct, record_path)
+        except Exception as e:
+            logger.error(f"❌ Failed to open session archive {record_path}, capturing without recording: {e}")
+    return sct
+
+def current_monitors(sct):
+    """
+    The monitor list (as in sct.monitors) as the OS reports it now. mss
+    enumerates the monitors once per instance and caches the list, so a
+    display added, removed or resized later would go unseen; a short-lived
+    instance reads them afresh. A replay keeps its recorded layout.
+    """
+    if isinstance(sct, RecordingCapture):
+        return sct.refresh_monitors()
+    if isinstance(sct, ReplayCapture):
+        return sct.monitors
+    try:
+        import mss
+        with mss.mss() as probe:
+            return probe.monitors
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to enumerate monitors, keeping the previous layout: {e}")
+        return sct.monitors
+
+def replay_time_scale(sct):
+    """
+    ScanScheduler.time_scale for a scan loop reading from sct. Live captures
+    keep the real cadence. A replay waits 1/speed of it, and not at all with
+    speed 0, until it has run out of frames and only repeats the last one.
+    """
+    if not isinstance(sct, ReplayCapture) or sct.exhausted:
+        return 1.0
+    return 1.0 / sct.speed if sct.speed > 0 else 0.0
+
+def frame_pixels(shot):
+    """
+    BGRA pixels of a grab as a height x width x 4 array. For an mss
+    screenshot this wraps its raw buffer with np.frombuffer instead of
+    copying it; replayed frames are already arrays.
+    """
+    raw = getattr(shot, "raw", None)
+    if raw is not None:
+        return np.frombuffer(raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+    return np.asarray(shot)
+
+class DesktopFrame:
+    """
+    One grab of the whole virtual desktop (sct.monitors[0]). view(monitor)
+    cuts a monitor out of it as a NumPy slice, without copying, so every
+    monitor is scanned from the same instant.
+    """
+
+    def __init__(self, shot, region):
+        self.shot = shot  # Owns the pixel buffer the views point into
+        self.pixels = frame_pixels(shot)
+        self.region = region
+
+    def view(self, monitor):
+        left = monitor["left"] - self.region["left"]
+        top = monitor["top"] - self.region["top"]
+        return self.pixels[top:top + monitor["height"], left:left + monitor["width"]]
+
+def grab_desktop(sct, region=None):
+    """Grab every monitor with a single capture call; region defaults to sct.monitors[0], the virtual desktop."""
+    region = region or sct.monitors[0]
+    return DesktopFrame(sct.grab(region), region)
+
+class CaptureService:
+    """
+    One long-lived capture context (see open_capture) per thread. mss
+    handles are tied to the thread that opened them, so each scan thread
+    keeps its own and reuses it for every grab instead of reconnecting.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self):
+        """The calling thread's capture, opened on first use."""
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = self._local.sct = open_capture()
+        return sct
+
+    @contextmanager
+    def session(self):
+        """Use the thread's capture for a scan loop; closes it afterwards if the loop opened it."""
+        owner = getattr(self._local, "sct", None) is None
+        sct = self.get()
+        try:
+            yield sct
+        finally:
+            if owner:
+                self.release()
+
+    def release(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is not None:
+            self._local.sct = None
+            sct.close()
+
+capture_service = CaptureService()
@@ -0,0 +1,86 @@
+import math
+import threading
+import cv2
+import numpy as np
+
+TILE_SIZE = 64          # Tile edge in screen pixels
+TILE_SAMPLES = 4        # Each tile's signature is a TILE_SAMPLES x TILE_SAMPLES grid of mean intensities
+CHANGE_THRESHOLD = 6    # Largest per-sample intensity delta still treated as "unchanged"
+
+class TileChangeDetector:
+    """
+    Splits captured frames into tiles and compares a cheap per-tile signature
+    (a few area-averaged gray samples) against the previous frame for the
+    same key, so callers can skip or narrow OCR and template matching when
+    the screen is static.
+
+    Callers may keep their last detection per key in `results` as
+    (generation, value) and reuse it when it was computed on the previous
+    frame and nothing changed since.
+    """
+
+    def __init__(self, tile_size=TILE_SIZE, threshold=CHANGE_THRESHOLD):
+        self.tile_size = tile_size
+        self.threshold = threshold
+        self.results = {}
+        self._signatures = {}   # key -> signature array
+        self._generations = {}  # key -> frames seen
+        self._lock = threading.Lock()
+
+    def signature(self, frame):
+        if frame.ndim == 3:
+            code = cv2.COLOR_BGRA2GRAY if frame.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+            frame = cv2.cvtColor(frame, code)
+        rows = math.ceil(frame.shape[0] / self.tile_size)
+        cols = math.ceil(frame.shape[1] / self.tile_size)
+        small = cv2.resize(frame, (cols * TILE_SAMPLES, rows * TILE_SAMPLES), interpolation=cv2.INTER_AREA)
+        return small.astype(np.int16)
+
+    def generation(self, key):
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    def update(self, key, frame):
+        """
+        Record frame as the latest for key and return the changed tiles as
+        (x, y, w, h) rectangles in frame pixels. The first frame for a key, or
+        one whose size changed, is reported as a single full-frame rectangle.
+        """
+        height, width = frame.shape[:2]
+        sig = self.signature(frame)
+        with self._lock:
+            previous = self._signatures.get(key)
+            self._signatures[key] = sig
+            self._generations[key] = self._generations.get(key, 0) + 1
+        if previous is None or previous.shape != sig.shape:
+            return [(0, 0, width, height)]
+
+        rows, cols = sig.shape[0] // TILE_SAMPLES, sig.shape[1] // TILE_SAMPLES
+        delta = np.abs(sig - previous).reshape(rows, TILE_SAMPLES, cols, TILE_SAMPLES).max(axis=(1, 3))
+        changed = np.argwhere(delta > self.threshold)
+        rects = []
+        for row, col in changed:
+            x, y = int(col) * self.tile_size, int(row) * self.tile_size
+            rects.append((x, y, min(self.tile_size, width - x), min(self.tile_size, height - y)))
+        return rects
+
+    def reset(self):
+        with self._lock:
+            self._signatures.clear()
+            self._generations.clear()
+            self.results.clear()
+
+def bounding_box(rects, pad_x=0, pad_y=0, width=None, height=None):
+    """Union of (x, y, w, h) rects grown by pad on each side and clipped to width x height."""
+    if not rects:
+        return None
+    x0 = min(r[0] for r in rects) - pad_x
+    y0 = min(r[1] for r in rects) - pad_y
+    x1 = max(r[0] + r[2] for r in rects) + pad_x
+    y1 = max(r[1] + r[3] for r in rects) + pad_y
+    x0, y0 = max(0, x0), max(0, y0)
+    if width is not None:
+        x1 = min(width, x1)
+    if height is not None:
+        y1 = min(height, y1)
+    return (x0, y0, x1 - x0, y1 - y0)
@@ -1,236 +1,156 @@
-import time
 import pyautogui
-import cv2
-import numpy as np
-import mss
 import traceback
-import os
-import gc
-from PIL import Image
-from core.ocr import preprocess_image, get_ocr_text_and_confidence
+from core.templates import template_registry
+from core.matcher import match_templates, match_templates_incremental, to_gray
+from core.change_detector import TileChangeDetector
+from core.capture import capture_service, grab_desktop, frame_pixels, current_monitors, replay_time_scale
 from core.logger import logger
-from core.utils import beep
+from core.roi import RoiTracker
+from core.scheduler import ScanScheduler
+from core.metrics import IterationTimer, optional_stage
+from core.utils import beep, load_roi_settings
 
-def scan_for_phrase_and_click(pos, monitor, phrase, interval, log_func, stop_event):
-    iteration = 0
-    with mss.mss() as sct:
-        log_func(f"🔎 Starting scan_for_phrase_and_click on monitor {monitor}")
-        if monitor['width'] <= 0 or monitor['height'] <= 0:
-            log_func(f"🚨 Invalid monitor dimensions: {monitor}. Recalibrate or check display settings.")
-            return
-        while not stop_event.is_set():
-            iteration += 1
-            start_time = time.time()
-            log_func(f"📸 [Iteration {iteration}] Capturing screenshot")
-            try:
-                screenshot = np.array(sct.grab(monitor))
-                logger.debug(f"Screenshot shape: {screenshot.shape}")
-                if screenshot.size == 0 or screenshot.shape[0] <= 0 or screenshot.shape[1] <= 0:
-                    log_func(f"🚨 Empty or invalid screenshot: {screenshot.shape}. Check monitor configuration.")
-                    time.sleep(interval)
-                    continue
-                image = cv2.cvtColor(screenshot, cv2.COLOR_BGRA2BGR)
-                processed = preprocess_image(image)
-                if processed is not None:
-                    text, conf = get_ocr_text_and_confidence(Image.fromarray(processed))
-                    text_upper = text.upper()
-                    log_func(f"📝 OCR detected: Confidence {conf:.2f}%")
-                    if phrase.upper() in text_upper and conf > 50:
-                        log_func(f"🖱️ Click detected phrase '{phrase}' at {pos}")
-                        pyautogui.click(pos)
-                        beep()
-                        time.sleep(3)
-                    else:
-                        log_func(f"⏳ Phrase '{phrase}' not found or low confidence. Sleeping for {interval}s")
-                        time.sleep(interval)
-                else:
-                    log_func("❌ Processed image is None, skipping iteration. Retrying next cycle.")
-                    time.sleep(interval)
-            except Exception as e:
-                log_func(f"🚨 Exception during scan: {e}\n{traceback.format_exc()}")
-                log_func("⚠️ Scan paused. Check monitor settings, Tesseract, or restart the app.")
-                time.sleep(interval)
-            elapsed = time.time() - start_time
-            log_func(f"⏱️ Iteration {iteration} took {elapsed:.3f} seconds")
-        log_func("🛑 scan_for_phrase_and_click stopped")
-
-def scan_for_download_phrase_with_beep(monitor, phrase, interval, log_func, stop_event):
-    iteration = 0
-    with mss.mss() as sct:
-        log_func(f"🔎 Starting scan_for_download_phrase_with_beep on monitor {monitor}")
-        if monitor['width'] <= 0 or monitor['height'] <= 0:
-            log_func(f"🚨 Invalid monitor dimensions: {monitor}. Recalibrate or check display settings.")
-            return
-        while not stop_event.is_set():
-            iteration += 1
-            start_time = time.time()
-            try:
-                screenshot = np.array(sct.grab(monitor))
-                logger.debug(f"Screenshot shape: {screenshot.shape}")
-                if screenshot.size == 0 or screenshot.shape[0] <= 0 or screenshot.shape[1] <= 0:
-                    log_func(f"🚨 Empty or invalid screenshot: {screenshot.shape}. Check monitor configuration.")
-                    time.sleep(interval)
-                    continue
-                image = cv2.cvtColor(screenshot, cv2.COLOR_BGRA2BGR)
-                processed = preprocess_image(image)
-                if processed is not None:
-                    text, conf = get_ocr_text_and_confidence(Image.fromarray(processed))
-                    text_upper = text.upper()
-                    log_func(f"📝 [Iteration {iteration}] OCR detected: Confidence {conf:.2f}%")
-                    if phrase.upper() in text_upper and conf > 50:
-                        log_func(f"🔔 Phrase '{phrase}' detected, beeping...")
-                        while phrase.upper() in text_upper and conf > 50 and not stop_event.is_set():
-                            beep()
-                            time.sleep(0.8)
-                            screenshot = np.array(sct.grab(monitor))
-                            image = cv2.cvtColor(screenshot, cv2.COLOR_BGRA2BGR)
-                            processed = preprocess_image(image)
-                            text, conf = get_ocr_text_and_confidence(Image.fromarray(processed))
-                            text_upper = text.upper()
-                        time.sleep(interval)
-                    else:
-                        log_func(f"⏳ Phrase '{phrase}' not detected or low confidence. Sleeping for {interval}s")
-                        time.sleep(interval)
-                else:
-                    log_func("❌ Processed image is None, skipping iteration. Retrying next cycle.")
-                    time.sleep(interval)
-            except Exception as e:
-                log_func(f"🚨 Exception during download phrase scan: {e}\n{traceback.format_exc()}")
-                log_func("⚠️ Beep scan paused. Check monitor, Tesseract, or restart the app.")
-                time.sleep(interval)
-            elapsed = time.time() - start_time
-            log_func(f"⏱️ Iteration {iteration} took {elapsed:.3f} seconds")
-        log_func("🛑 scan_for_download_phrase_with_beep stopped")
-
-def resize_image_to_fit(image_path, max_width, max_height, log_func):
-    """Resize image to fit within max_width and max_height while maintaining aspect ratio."""
-    try:
-        img = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
-        if img is None:
-            log_func(f"❌ Failed to load image: {image_path}")
-            logger.error(f"Failed to load image: {image_path}")
-            return None
-        height, width = img.shape[:2]
-        log_func(f"📏 Image {image_path} dimensions: {width}x{height}")
-        logger.debug(f"Image {image_path} dimensions: {width}x{height}")
-        
-        if width <= max_width and height <= max_height:
-            log_func(f"✅ Image {image_path} dimensions are valid")
-            return image_path
-
-        # Calculate scaling factor to fit within max dimensions
-        scale = min(max_width / width, max_height / height)
-        new_width = int(width * scale)
-        new_height = int(height * scale)
-        log_func(f"🔄 Resizing {image_path} from {width}x{height} to {new_width}x{new_height}")
-        logger.info(f"Resizing {image_path} from {width}x{height} to {new_width}x{new_height}")
+def scan_for_phrase_and_click(pos, monitor, phrase, interval, log_func, stop_event, frame_bus=None):
+    """Click pos whenever phrase shows up in the OCR frames published by frame_bus."""
+    if frame_bus is None:
+        from core.frame_bus import OcrFrameBus
+        frame_bus = OcrFrameBus(monitor, interval, log_func, stop_event, RoiTracker(pos, monitor, **load_roi_settings()))
+        frame_bus.start()
+    frame_bus.watch(phrase, located=True)
+    log_func(f"🔎 Starting scan_for_phrase_and_click on monitor {monitor}")
+    if monitor['width'] <= 0 or monitor['height'] <= 0:
+        log_func(f"🚨 Invalid monitor dimensions: {monitor}. Recalibrate or check display settings.")
+        return
+    last_seq = 0
+    while not stop_event.is_set():
+        frame = frame_bus.wait_for_frame(last_seq)
+        if frame is None:
+            continue
+        last_seq = frame.seq
+        try:
+            if phrase.upper() in frame.text.upper() and frame.conf > 50:
+                log_func(f"🖱️ Click detected phrase '{phrase}' at {pos}")
+                timer = IterationTimer("click_scanner", frame.seq)
+                with timer.stage("action"):
+                    pyautogui.click(pos)
+                    beep()
+                timer.set(phrase=phrase, hit=True, conf=round(float(frame.conf), 2))
+                timer.emit()
+                if frame_bus.scheduler.sleep(3):  # Paced like the bus, so replays don't wait out live delays
+                    frame_bus.request_refresh()
+            else:
+                log_func(f"⏳ Phrase '{phrase}' not found or low confidence. Waiting for next frame.")
+        except Exception as e:
+            log_func(f"🚨 Exception during scan: {e}\n{traceback.format_exc()}")
+            log_func("⚠️ Scan paused. Check monitor settings, Tesseract, or restart the app.")
+    log_func("🛑 scan_for_phrase_and_click stopped")
 
-        resized_img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_AREA)
-        resized_path = f"assets/resized_{os.path.basename(image_path)}"
-        cv2.imwrite(resized_path, resized_img)
-        log_func(f"💾 Saved resized image to {resized_path}")
-        logger.info(f"Saved resized image to {resized_path}")
-        return resized_path
-    except Exception as e:
-        log_func(f"❌ Error resizing image {image_path}: {e}\n{traceback.format_exc()}")
-        logger.error(f"Error resizing image {image_path}: {e}\n{traceback.format_exc()}")
-        return None
-    finally:
-        img = None
+def scan_for_download_phrase_with_beep(monitor, phrase, interval, log_func, stop_event, frame_bus=None):
+    """Beep for as long as phrase stays visible in the OCR frames published by frame_bus."""
+    if frame_bus is None:
+        from core.frame_bus import OcrFrameBus
+        frame_bus = OcrFrameBus(monitor, interval, log_func, stop_event)
+        frame_bus.start()
+    frame_bus.watch(phrase)
+    log_func(f"🔎 Starting scan_for_download_phrase_with_beep on monitor {monitor}")
+    if monitor['width'] <= 0 or monitor['height'] <= 0:
+        log_func(f"🚨 Invalid monitor dimensions: {monitor}. Recalibrate or check display settings.")
+        return
+    last_seq = 0
+    while not stop_event.is_set():
+        frame = frame_bus.wait_for_frame(last_seq)
+        if frame is None:
+            continue
+        last_seq = frame.seq
+        try:
+            if phrase.upper() in frame.text.upper() and frame.conf > 50:
+                log_func(f"🔔 Phrase '{phrase}' detected, beeping...")
+                timer = IterationTimer("download_scanner", frame.seq)
+                timer.set(phrase=phrase, hit=True, conf=round(float(frame.conf), 2), beeps=0)
+                while frame and phrase.upper() in frame.text.upper() and frame.conf > 50 and not stop_event.is_set():
+                    with timer.stage("action"):
+                        beep()
+                    timer.record["beeps"] += 1
+                    if not frame_bus.scheduler.sleep(0.8):
+                        break
+                    frame_bus.request_refresh()
+                    frame = frame_bus.wait_for_frame(last_seq)
+                    if frame:
+                        last_seq = frame.seq
+                timer.emit()
+            else:
+                log_func(f"⏳ Phrase '{phrase}' not detected or low confidence. Waiting for next frame.")
+        except Exception as e:
+            log_func(f"🚨 Exception during download phrase scan: {e}\n{traceback.format_exc()}")
+            log_func("⚠️ Beep scan paused. Check monitor, Tesseract, or restart the app.")
+    log_func("🛑 scan_for_download_phrase_with_beep stopped")
 
-def locate_image_on_screen(image_path, monitor, confidence, log_func):
-    """Locate image on monitor using OpenCV and mss screenshot."""
+def locate_images_on_screen(image_paths, monitor, confidence, log_func, sct=None, detector=None, timer=None, screenshot=None):
+    """
+    Grab monitor once and look for every template in image_paths on that frame.
+    Returns a dict mapping each path to (center_x, center_y, w, h) or None.
+    Grabs go through sct if given, otherwise through the calling thread's
+    capture from capture_service. Pass a BGRA frame of monitor as screenshot
+    (e.g. a DesktopFrame view) to match on it without grabbing, a
+    TileChangeDetector as detector to only rematch tiles that changed, and an
+    IterationTimer as timer to record capture/convert/match times.
+    """
+    hits = {path: None for path in image_paths}
     try:
-        # Validate image path
-        if not os.path.exists(image_path):
-            log_func(f"❌ Image file does not exist: {image_path}")
-            logger.error(f"Image file does not exist: {image_path}")
-            return None
-
-        # Load template image
-        template = cv2.imread(image_path, cv2.IMREAD_COLOR)
-        if template is None:
-            log_func(f"❌ Failed to load template image: {image_path}")
-            logger.error(f"Failed to load template image: {image_path}")
-            return None
-        
-        if template.size == 0 or template.shape[0] <= 0 or template.shape[1] <= 0:
-            log_func(f"❌ Invalid template image: {image_path}, shape: {template.shape}")
-            logger.error(f"Invalid template image: {image_path}, shape: {template.shape}")
-            return None
-
-        template_height, template_width = template.shape[:2]
-        log_func(f"📏 Template {image_path} dimensions: {template_width}x{template_height}")
-        logger.debug(f"Template {image_path} dimensions: {template_width}x{template_height}")
+        templates = {}
+        for path in image_paths:
+            # Decoded and fitted to this monitor once, then served from memory
+            template = template_registry.get(path, monitor, log_func)
+            if template is None:
+                log_func(f"❌ Failed to load template image: {path}")
+                logger.error(f"Failed to load template image: {path}")
+                continue
+            templates[path] = template
+        if not templates:
+            return hits
 
-        # Short delay to stabilize
-        time.sleep(0.1)
-
-        # Capture screenshot
-        with mss.mss() as sct:
-            screenshot = np.array(sct.grab(monitor))
-            if screenshot.size == 0 or screenshot.shape[0] <= 0 or screenshot.shape[1] <= 0:
-                log_func(f"🚨 Empty or invalid screenshot for monitor {monitor}")
-                logger.error(f"Empty or invalid screenshot for monitor {monitor}")
-                return None
-            
-            screenshot = cv2.cvtColor(screenshot, cv2.COLOR_BGRA2BGR)
-            screenshot_height, screenshot_width = screenshot.shape[:2]
-            log_func(f"📸 Screenshot dimensions: {screenshot_width}x{screenshot_height}")
-            logger.debug(f"Screenshot dimensions: {screenshot_width}x{screenshot_height}")
-
-            # Check dimensions
-            if template_width > screenshot_width or template_height > screenshot_height:
-                log_func(f"❌ Template {image_path} ({template_width}x{template_height}) exceeds screenshot ({screenshot_width}x{screenshot_height})")
-                logger.error(f"Template {image_path} ({template_width}x{template_height}) exceeds screenshot ({screenshot_width}x{screenshot_height})")
-                return None
-
-            # Perform template matching
-            try:
-                result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
-                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-                
-                log_func(f"🔍 Match confidence: {max_val:.3f} (threshold: {confidence})")
-                logger.debug(f"Match confidence: {max_val:.3f} at location {max_loc}")
+        if screenshot is None:
+            with optional_stage(timer, "capture"):
+                screenshot = frame_pixels((sct or capture_service.get()).grab(monitor))
+        if screenshot.size == 0 or screenshot.shape[0] <= 0 or screenshot.shape[1] <= 0:
+            log_func(f"🚨 Empty or invalid screenshot for monitor {monitor}")
+            logger.error(f"Empty or invalid screenshot for monitor {monitor}")
+            return hits
 
-                if max_val >= confidence:
-                    # Calculate center of matched region
-                    center_x = monitor["left"] + max_loc[0] + template_width // 2
-                    center_y = monitor["top"] + max_loc[1] + template_height // 2
-                    return (center_x, center_y, template_width, template_height)
-                else:
-                    return None
-            except cv2.error as e:
-                log_func(f"❌ OpenCV error during template matching for {image_path}: {e}\n{traceback.format_exc()}")
-                logger.error(f"OpenCV error during template matching for {image_path}: {e}\n{traceback.format_exc()}")
-                return None
-            except MemoryError:
-                log_func(f"❌ Memory error during template matching for {image_path}\n{traceback.format_exc()}")
-                logger.error(f"Memory error during template matching for {image_path}\n{traceback.format_exc()}")
-                return None
+        # Matching runs on grayscale, so convert straight from BGRA into a reused buffer
+        with optional_stage(timer, "convert"):
+            screenshot = to_gray(screenshot, "match_gray")
+        screenshot_height, screenshot_width = screenshot.shape[:2]
+        if timer:
+            timer.set(frame_width=int(screenshot_width), frame_height=int(screenshot_height))
+        logger.debug(f"Screenshot dimensions: {screenshot_width}x{screenshot_height}, matching {len(templates)} templates")
 
+        with optional_stage(timer, "match"):
+            if detector is None:
+                hits.update(match_templates(screenshot, templates, monitor, confidence, log_func))
+            else:
+                hits.update(match_templates_incremental(screenshot, templates, monitor, confidence, log_func, detector))
+        return hits
     except Exception as e:
-        log_func(f"❌ Error locating image {image_path}: {e}\n{traceback.format_exc()}")
-        logger.error(f"Error locating image {image_path}: {e}\n{traceback.format_exc()}")
-        return None
-    finally:
-        # Clean up to prevent memory leaks
-        template = None
-        screenshot = None
-        gc.collect()
+        log_func(f"❌ Error locating images {list(image_paths)}: {e}\n{traceback.format_exc()}")
+        logger.error(f"Error locating images {list(image_paths)}: {e}\n{traceback.format_exc()}")
+        return hits
 
-def find_and_handle_reference_images(log_func, stop_event, confidence=0.8):
+def locate_image_on_screen(image_path, monitor, confidence, log_func, sct=None, detector=None, timer=None, screenshot=None):
+    """Locate image on monitor using OpenCV and a screen (or replayed) capture."""
+    return locate_images_on_screen([image_path], monitor, confidence, log_func, sct, detector, timer, screenshot)[image_path]
+
+def find_and_handle_reference_images(log_func, stop_event, confidence=0.8, interval=10):
     """
     Searches for two reference images on all available monitors:
     - If 'assets/continue_playing.png' is found, clicks its center and continues scanning.
     - If 'assets/click_download.png' is found, beeps continuously until it's gone.
+    Each cycle grabs the whole virtual desktop once and scans every monitor
+    on its slice of that grab. Cycles follow a ScanScheduler cadence around
+    interval seconds, and every wait returns as soon as stop_event is set.
     Extensive debug messages are logged to both the app console and terminal.
     """
-    import time
     import traceback
-    import mss
-    import os
-    import gc
     from core.logger import logger
     from core.utils import beep
 
@@ -240,80 +160,105 @@ def find_and_handle_reference_images(log_func, stop_event, confidence=0.8):
     log_func(f"🔎 [find_and_handle_reference_images] Starting image search loop on all monitors. Continue image: {continue_img_path}, Download image: {download_img_path}, Confidence: {confidence}")
     logger.debug(f"[find_and_handle_reference_images] Entered function with continue_img_path={continue_img_path}, download_img_path={download_img_path}, confidence={confidence}")
 
-    with mss.mss() as sct:
-        monitors = sct.monitors[1:]  # [0] is the virtual full screen, [1:] are real monitors
+    # Skips matching on static frames and narrows it to changed tiles otherwise
+    detector = TileChangeDetector()
+    scheduler = ScanScheduler(interval, stop_event)
+
+    with capture_service.session() as sct:
+        layout = current_monitors(sct)
+        monitors = layout[1:]  # [0] is the virtual full screen, [1:] are real monitors
         log_func(f"🖥️ Detected {len(monitors)} monitors.")
         logger.debug(f"Detected {len(monitors)} monitors: {monitors}")
 
+        cycle = 0
         while not stop_event.is_set():
+            cycle += 1
             try:
                 found_any = False
+                scheduler.time_scale = replay_time_scale(sct)
+                if cycle > 1:
+                    # Displays can be plugged in, removed or resized between cycles
+                    layout = current_monitors(sct)
+                    monitors = layout[1:]
+                template_registry.set_layout(monitors)
+                desktop = None
                 for idx, monitor in enumerate(monitors):
-                    max_width, max_height = monitor["width"], monitor["height"]
-                    
                     log_func(f"🔍 Scanning monitor {idx+1}...")
                     logger.debug(f"Scanning monitor {idx+1} with region {monitor}")
 
-                    # Resize images if necessary
-                    continue_img = resize_image_to_fit(continue_img_path, max_width, max_height, log_func)
-                    download_img = resize_image_to_fit(download_img_path, max_width, max_height, log_func)
-                    
-                    if not continue_img or not download_img:
+                    # Templates are decoded once and fitted per monitor geometry in memory
+                    continue_img = template_registry.get(continue_img_path, monitor, log_func)
+                    download_img = template_registry.get(download_img_path, monitor, log_func)
+
+                    if continue_img is None or download_img is None:
                         log_func("❌ Skipping iteration due to image loading or resizing failure.")
-                        time.sleep(1)
+                        stop_event.wait(1)  # Not scaled for replays: retrying sooner can't help
                         continue
 
-                    # Search for "click to continue playing"
-                    log_func(f"🖼️ Searching for 'click to continue playing' on monitor {idx+1} region {monitor}...")
-                    logger.debug(f"Attempting to locate 'click to continue playing' on monitor {idx+1} region {monitor}.")
-                    continue_location = locate_image_on_screen(continue_img, monitor, confidence, log_func)
+                    # Both templates are matched on this monitor's slice of the desktop grab
+                    log_func(f"🖼️ Searching for 'click to continue playing' and 'click to download' on monitor {idx+1} region {monitor}...")
+                    logger.debug(f"Attempting to locate both reference images on monitor {idx+1} region {monitor}.")
+                    timer = IterationTimer("image_search", cycle)
+                    if desktop is None:
+                        # One capture call for all monitors; each gets a zero-copy slice of it
+                        with timer.stage("capture"):
+                            desktop = grab_desktop(sct, layout[0])
+                    hits = locate_images_on_screen([continue_img_path, download_img_path], monitor, confidence, log_func, sct, detector, timer,
+                                                   screenshot=desktop.view(monitor))
+                    continue_location = hits[continue_img_path]
+                    download_location = hits[download_img_path]
+                    if continue_location or download_location:
+                        desktop = None  # The screen is about to change; later monitors need a fresh grab
+                    timer.set(monitor=idx + 1, continue_hit=bool(continue_location), download_hit=bool(download_location))
 
                     if continue_location:
                         center_x, center_y, width, height = continue_location
                         log_func(f"✅ Found 'click to continue playing' on monitor {idx+1} at center ({center_x}, {center_y}). Clicking...")
                         logger.info(f"Found 'click to continue playing' on monitor {idx+1} at center ({center_x}, {center_y}). Clicking now.")
-                        pyautogui.click(center_x, center_y)
-                        beep()
+                        with timer.stage("action"):
+                            pyautogui.click(center_x, center_y)
+                            beep()
                         log_func("🖱️ Clicked the center of 'click to continue playing' image.")
                         logger.debug("Clicked the center of 'click to continue playing' image. Continuing scan.")
-                        time.sleep(1)  # Delay to allow screen update
                         found_any = True
+                        if not scheduler.sleep(1):  # Delay to allow screen update
+                            timer.emit()
+                            break
+                        # The click may have dismissed or moved the download prompt
+                        download_location = locate_image_on_screen(download_img_path, monitor, confidence, log_func, sct, detector)
                     else:
                         log_func(f"❌ 'click to continue playing' not found on monitor {idx+1}.")
                         logger.debug(f"'click to continue playing' not found on monitor {idx+1}.")
 
-                    # Search for "click to download"
-                    log_func(f"🖼️ Searching for 'click to download' on monitor {idx+1} region {monitor}...")
-                    logger.debug(f"Attempting to locate 'click to download' on monitor {idx+1} region {monitor}.")
-                    download_location = locate_image_on_screen(download_img, monitor, confidence, log_func)
-
                     if download_location:
                         log_func(f"🚨 Found 'click to download' on monitor {idx+1}. Starting beep loop until image disappears.")
                         logger.warning(f"Found 'click to download' on monitor {idx+1}. Beeping until gone.")
+                        timer.set(beeps=0)
                         while download_location and not stop_event.is_set():
-                            beep()
+                            with timer.stage("action"):
+                                beep()
+                            timer.record["beeps"] += 1
                             log_func("🔔 Beeping! 'Click to download' image still present.")
                             logger.debug("Beeped for 'click to download'. Checking again in 0.5s.")
-                            time.sleep(0.5)
-                            download_location = locate_image_on_screen(download_img, monitor, confidence, log_func)
+                            if not scheduler.sleep(0.5):
+                                break
+                            download_location = locate_image_on_screen(download_img_path, monitor, confidence, log_func, sct, detector)
                         log_func("✅ 'click to download' image is gone. Stopped beeping.")
                         logger.info("'click to download' image is gone. Stopped beeping.")
                         found_any = True
                     else:
                         log_func(f"❌ 'click to download' not found on monitor {idx+1}.")
                         logger.debug(f"'click to download' not found on monitor {idx+1}.")
+                    timer.emit()
 
-                    # Short delay between monitors
-                    time.sleep(0.5)
-
+                scheduler.record(found_any)
                 if not found_any:
-                    log_func("🔍 Neither image found on any monitor. Sleeping for 10s before next scan cycle.")
-                    logger.debug("Neither image found on any monitor. Sleeping for 10s.")
-                    time.sleep(10)
-                gc.collect()  # Clean up memory after each cycle
+                    log_func(f"🔍 Neither image found on any monitor. Next scan cycle in {scheduler.period:.1f}s.")
+                    logger.debug(f"Neither image found on any monitor. Next scan in {scheduler.period:.1f}s.")
+                scheduler.wait()
             except Exception as e:
                 log_func(f"❌ Exception in find_and_handle_reference_images: {e}\n{traceback.format_exc()}")
                 logger.error(f"Exception in find_and_handle_reference_images: {e}\n{traceback.format_exc()}")
-                time.sleep(1)
+                stop_event.wait(1)  # Not scaled for replays, so a persistent error doesn't spin
         log_func("🛑 [find_and_handle_reference_images] Stopped by stop_event.")
         logger.info("[find_and_handle_reference_images] Stopped by stop_event.")
\ No newline at end of file
@@ -0,0 +1,241 @@
+import time
+import threading
+import traceback
+from collections import namedtuple
+import cv2
+from core.ocr import (preprocess_image, get_ocr_text_and_confidence, get_ocr_text_and_confidence_parallel,
+                      preprocess_profiles, measure_profile, PROFILE_MAX_AGE, NO_TEXT_RETRY)
+from core.change_detector import TileChangeDetector, bounding_box
+from core.text_regions import propose_text_regions, build_mosaic
+from core.buffers import frame_buffers
+from core.scheduler import ScanScheduler, POLL_SLICE
+from core.metrics import IterationTimer, optional_stage
+from core.capture import open_capture, frame_pixels, replay_time_scale
+from core.logger import logger
+
+# One OCR'd frame as seen by every subscriber. `seq` increases by one per capture
+# and `monitor` is the region that was actually captured.
+OcrFrame = namedtuple("OcrFrame", ["seq", "timestamp", "text", "conf", "monitor"])
+
+class OcrFrameBus:
+    """
+    Captures, preprocesses and OCRs a monitor once per cycle and fans the
+    result out to any number of phrase scanners. Subscribers call
+    wait_for_frame() with the last sequence number they handled and get the
+    next frame as soon as the producer publishes it.
+
+    With an RoiTracker only the box around the calibrated point is captured,
+    falling back to the whole monitor after repeated misses, as long as
+    every watched phrase was watched with located=True (the one clicked at
+    that point). A phrase without a location can show up anywhere, so while
+    one is watched every capture covers the whole monitor.
+
+    Frames are also diffed tile by tile against the previous capture of the
+    same region: a static frame reuses the last OCR result, and after a miss
+    only the tiles changed since the last whole-region OCR are OCR'd.
+
+    Captures follow a ScanScheduler cadence: faster right after a phrase was
+    seen, slower while nothing shows up, and immediately on request_refresh().
+
+    With parallel_ocr, full-monitor captures are OCR'd as overlapping bands
+    on a process pool instead of on this thread alone.
+
+    With text_regions, a cheap proposal pass finds the text-like boxes of
+    the frame and only those, packed into one image, are preprocessed and
+    OCR'd; a frame with no candidates skips OCR. Off by default until its
+    OCR recall in benchmarks/bench_pipeline.py matches --full-frame.
+
+    Preprocessing follows a profile measured from the text height of each
+    captured region and cached in preprocess_profiles, so text reaches
+    Tesseract near its preferred size instead of always upscaled 2x.
+    """
+
+    def __init__(self, monitor, interval, log_func, stop_event, roi=None, parallel_ocr=False, text_regions=False):
+        self.monitor = monitor
+        self.roi = roi
+        self.parallel_ocr = parallel_ocr
+        self.text_regions = text_regions
+        self.phrases = set()
+        self.located = set()
+        self.detector = TileChangeDetector()
+        self.interval = interval
+        self.log_func = log_func
+        self.stop_event = stop_event
+        self._frame = None
+        self._cond = threading.Condition()
+        self._refresh = threading.Event()
+        self._thread = None
+        self.last_hit = False
+        self.scheduler = ScanScheduler(interval, stop_event, wake_event=self._refresh)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._thread = threading.Thread(target=self.run, daemon=True, name="OcrFrameBusThread")
+        self._thread.start()
+        return self._thread
+
+    def join(self, timeout=None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def watch(self, phrase, located=False):
+        """
+        Register a phrase subscribers look for. located marks a phrase that
+        appears around the ROI's calibrated point, so its hits and misses
+        drive the ROI box.
+        """
+        self.phrases.add(phrase.upper())
+        if located:
+            self.located.add(phrase.upper())
+
+    def uses_roi(self):
+        """True if captures follow the ROI: there is one and no watched phrase lacks a location."""
+        return self.roi is not None and not (self.phrases - self.located)
+
+    def capture_region(self):
+        if not self.uses_roi():
+            return dict(self.monitor)
+        return self.roi.region()
+
+    def request_refresh(self):
+        """Ask the producer to capture a new frame now instead of waiting for the interval."""
+        self._refresh.set()
+
+    def publish(self, text, conf, region=None):
+        with self._cond:
+            seq = self._frame.seq + 1 if self._frame else 1
+            self._frame = OcrFrame(seq, time.time(), text, conf, region or self.monitor)
+            self._cond.notify_all()
+        return self._frame
+
+    def wait_for_frame(self, last_seq=0, timeout=None):
+        """Block until a frame newer than last_seq is published. Returns None on stop or timeout."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while not self.stop_event.is_set():
+                if self._frame and self._frame.seq > last_seq:
+                    return self._frame
+                remaining = POLL_SLICE if deadline is None else min(POLL_SLICE, deadline - time.time())
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+        return None
+
+    def capture_once(self, sct, timer=None):
+        region = self.capture_region()
+        with optional_stage(timer, "capture"):
+            shot = sct.grab(region)
+            screenshot = frame_pixels(shot)  # A view of the grab's buffer, not a copy
+        logger.debug(f"Screenshot shape: {screenshot.shape}")
+        if timer:
+            timer.set(frame_width=int(screenshot.shape[1]), frame_height=int(screenshot.shape[0]))
+        if screenshot.size == 0 or screenshot.shape[0] <= 0 or screenshot.shape[1] <= 0:
+            self.log_func(f"🚨 Empty or invalid screenshot: {screenshot.shape}. Check monitor configuration.")
+            return None
+        # OCR, the tile diff and preprocessing all work on gray, so convert once straight from BGRA
+        with optional_stage(timer, "convert"):
+            image = cv2.cvtColor(screenshot, cv2.COLOR_BGRA2GRAY, dst=frame_buffers.get("capture_gray", screenshot.shape[:2]))
+
+        key = (region["left"], region["top"], region["width"], region["height"])
+        with optional_stage(timer, "diff"):
+            dirty = self.detector.update(key, image)
+        generation = self.detector.generation(key)
+        # (generation, (text, conf, hit), changed tiles OCR'd as crops since the last whole-region OCR or None)
+        previous = self.detector.results.get(key)
+        fresh = previous is not None and previous[0] == generation - 1
+        pending = None
+        if fresh and not dirty and previous[2] is None:
+            logger.debug("Frame unchanged since last capture, reusing OCR result")
+            text, conf, hit = previous[1]
+            mode = "reused"
+        else:
+            full_scan = self.roi is None or self.roi.is_full(region)
+            mode = "full" if full_scan else "roi"
+            profile = preprocess_profiles.get(key)
+            if profile is None:
+                with optional_stage(timer, "profile"):
+                    profile, text_height = measure_profile(image)
+                preprocess_profiles.put(key, profile, PROFILE_MAX_AGE if text_height else NO_TEXT_RETRY)
+                measured = f"text height {text_height:.0f}px" if text_height else "no text measured"
+                logger.info(f"🔠 OCR profile for {region['width']}x{region['height']} region: {profile.name} "
+                            f"x{profile.scale}, {profile.binarize} binarization ({measured})")
+            if timer:
+                timer.set(profile=profile.name, ocr_scale=profile.scale)
+            if fresh and dirty and not previous[1][2]:
+                # Last frame had no phrase, so only the tiles changed since the last whole-region
+                # OCR can add one; all of them are read again so a phrase drawn over several
+                # captures isn't cut. A static frame after such a miss gets a whole-region OCR.
+                pending = list(set(previous[2] or []).union(dirty))
+                height, width = image.shape[:2]
+                tile = self.detector.tile_size
+                x, y, w, h = bounding_box(pending, tile, tile, width, height)
+                logger.debug(f"{len(pending)} changed tiles, OCR limited to {w}x{h} at ({x}, {y})")
+                image = image[y:y + h, x:x + w]
+                full_scan = False
+                mode = "dirty"
+            regions = None
+            if self.text_regions:
+                with optional_stage(timer, "regions"):
+                    regions = propose_text_regions(image)
+                    if regions:
+                        image = build_mosaic(image, regions)
+                if timer and regions is not None:
+                    timer.set(regions=len(regions))
+            if regions == []:
+                logger.debug("No text-like regions in frame, skipping OCR")
+                text, conf, hit = "", 0.0, False
+            else:
+                with optional_stage(timer, "preprocess"):
+                    processed = preprocess_image(image, profile)
+                if processed is None:
+                    self.log_func("❌ Processed image is None, skipping iteration. Retrying next cycle.")
+                    return None
+                with optional_stage(timer, "ocr"):
+                    if self.parallel_ocr and full_scan:
+                        text, conf = get_ocr_text_and_confidence_parallel(processed)
+                    else:
+                        text, conf = get_ocr_text_and_confidence(processed)
+                if timer:
+                    timer.set(ocr_width=int(processed.shape[1]), ocr_height=int(processed.shape[0]))
+                text_upper = text.upper()
+                hit = conf > 50 and any(phrase in text_upper for phrase in self.phrases)
+        self.detector.results[key] = (generation, (text, conf, hit), pending)
+        self.last_hit = hit
+        if timer:
+            timer.set(mode=mode, hit=bool(hit), conf=round(float(conf), 2))
+        if self.uses_roi():
+            text_upper = text.upper()
+            self.roi.record(region, conf > 50 and any(phrase in text_upper for phrase in self.located))
+        return self.publish(text, conf, region)
+
+    def run(self):
+        iteration = 0
+        with open_capture() as sct:
+            self.log_func(f"🔎 Starting OCR frame bus on monitor {self.monitor}")
+            if self.monitor['width'] <= 0 or self.monitor['height'] <= 0:
+                self.log_func(f"🚨 Invalid monitor dimensions: {self.monitor}. Recalibrate or check display settings.")
+                return
+            while not self.stop_event.is_set():
+                iteration += 1
+                start_time = time.time()
+                self._refresh.clear()
+                self.last_hit = False
+                timer = IterationTimer("ocr_bus", iteration)
+                try:
+                    frame = self.capture_once(sct, timer)
+                    if frame:
+                        self.log_func(f"📝 [Iteration {iteration}] OCR detected on {frame.monitor['width']}x{frame.monitor['height']} region: Confidence {frame.conf:.2f}%")
+                except Exception as e:
+                    timer.set(error=repr(e))
+                    self.log_func(f"🚨 Exception during OCR capture: {e}\n{traceback.format_exc()}")
+                    self.log_func("⚠️ Scan paused. Check monitor settings, Tesseract, or restart the app.")
+                timer.emit()
+                elapsed = time.time() - start_time
+                self.log_func(f"⏱️ Iteration {iteration} took {elapsed:.3f} seconds")
+                self.scheduler.record(self.last_hit)
+                self.scheduler.time_scale = replay_time_scale(sct)
+                self.scheduler.wait()
+        with self._cond:
+            self._cond.notify_all()
+        self.log_func("🛑 OCR frame bus stopped")
@@ -0,0 +1,14 @@
+import os
+
+LOG_DIR = os.path.join(os.path.expanduser("~"), "Documents", "AutoClickerLogs")
+LOG_FILE_NAME = "autoclicker.log"
+
+def default_log_path():
+    """
+    The log file core.logger writes to, worked out without creating,
+    opening or configuring anything, so tools reading the log can import it
+    while the app runs. Importing core.logger would set up logging.
+    """
+    if os.path.isdir(LOG_DIR):
+        return os.path.join(LOG_DIR, LOG_FILE_NAME)
+    return LOG_FILE_NAME
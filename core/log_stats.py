@@ -0,0 +1,265 @@
+"""
+Statistical performance report from the auto-clicker logs, no LLM needed.
+
+Parses the log written by core.logger and its rotated backups
+(autoclicker.log.3.gz ... autoclicker.log.1.gz, autoclicker.log) and aggregates,
+per time window and thread: iteration durations, clicks, beeps, OCR and
+template-match confidences and errors. The report has throughput,
+p50/p95/p99 iteration latency and error rates, written as CSV and HTML.
+
+Parsed counts are kept in an index file next to the log together with the
+byte offset reached in every file, so a rerun only reads what was appended
+since. Files are recognised by their first line, which survives rotation
+and compression. Buckets hold only mergeable aggregates: counts, sums, and
+a log-spaced histogram of iteration durations that the percentiles are
+read from, so the index grows with the number of windows, not of lines.
+
+    python -m core.log_stats [--log PATH] [--window 60] [--out-dir DIR] [--rebuild]
+"""
+import os
+import re
+import csv
+import gzip
+import html
+import json
+import math
+import time
+import argparse
+from datetime import datetime
+
+WINDOW_MINUTES = 60       # Default aggregation window
+INDEX_VERSION = 3
+BACKUP_COUNT = 3          # Matches the RotatingFileHandler in core/logger.py
+HIST_GROWTH = 1.02        # Width ratio of consecutive duration bins, so percentiles are within 1%
+HIST_FLOOR = 0.001        # Durations below this (the log prints 3 decimals) share one bin
+
+LINE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})(?:,\d+)? \[(\w+)\] (?:\(([^)]*)\) )?(?:\[(\w+)\] )?(.*)$")
+UI_PREFIX_RE = re.compile(r"^\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\] ")  # Added by AutoClickerApp.log
+ITERATION_RE = re.compile(r"⏱️ Iteration \d+ took ([\d.]+) seconds")
+OCR_CONF_RE = re.compile(r"Confidence ([\d.]+)%")
+MATCH_CONF_RE = re.compile(r"match confidence: ([\d.]+)")
+
+def log_files(log_path):
+    """
+    The rotated backups oldest first, then the live log; only those that
+    exist. Backups are gzipped, but one may still be plain while it is
+    being compressed.
+    """
+    paths = []
+    for i in range(BACKUP_COUNT, 0, -1):
+        paths += [f"{log_path}.{i}.gz", f"{log_path}.{i}"]
+    return [p for p in paths + [log_path] if os.path.exists(p)]
+
+def _open_log(path):
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+def _fingerprint(path):
+    """First line of the file, which stays with the content when the handler rotates it."""
+    with _open_log(path) as f:
+        line = f.readline()
+    if not line.endswith(b"\n"):
+        return None
+    return line.decode("utf-8", errors="ignore").rstrip("\r\n")
+
+def _new_bucket():
+    # ocr_conf and match_conf are [count, sum]; durations maps histogram bin -> count
+    return {"lines": 0, "iterations": 0, "durations": {}, "clicks": 0, "beeps": 0,
+            "ocr_conf": [0, 0.0], "match_conf": [0, 0.0], "errors": 0}
+
+def _duration_bin(seconds):
+    """Histogram bin of a duration; a string, since the bins are JSON object keys."""
+    if seconds < HIST_FLOOR:
+        return "0"
+    return str(int(math.floor(math.log(seconds / HIST_FLOOR, HIST_GROWTH))) + 1)
+
+def _bin_value(key):
+    """Representative duration of a bin: the geometric middle of its range."""
+    k = int(key)
+    return 0.0 if k == 0 else HIST_FLOOR * HIST_GROWTH ** (k - 0.5)
+
+def _add_to(aggregate, value):
+    aggregate[0] += 1
+    aggregate[1] += value
+
+def parse_line(line):
+    """(timestamp, thread, level, message) for a log record line, None for continuation lines."""
+    m = LINE_RE.match(line)
+    if not m:
+        return None
+    timestamp, level, thread, _, message = m.groups()
+    return timestamp, thread or "unknown", level, UI_PREFIX_RE.sub("", message, count=1)
+
+def add_line(buckets, window_minutes, line):
+    parsed = parse_line(line)
+    if parsed is None:
+        return
+    timestamp, thread, level, message = parsed
+    start = datetime.fromisoformat(timestamp)
+    minute = (start.hour * 60 + start.minute) // window_minutes * window_minutes
+    window = f"{start:%Y-%m-%d} {minute // 60:02d}:{minute % 60:02d}"
+    bucket = buckets.setdefault(window, {}).setdefault(thread, _new_bucket())
+    bucket["lines"] += 1
+
+    m = ITERATION_RE.search(message)
+    if m:
+        duration = float(m.group(1))
+        key = _duration_bin(duration)
+        bucket["iterations"] += 1
+        bucket["durations"][key] = bucket["durations"].get(key, 0) + 1
+    if "🖱️" in message:
+        bucket["clicks"] += 1
+    if "🔔" in message:
+        bucket["beeps"] += 1
+    m = OCR_CONF_RE.search(message)
+    if m:
+        _add_to(bucket["ocr_conf"], float(m.group(1)))
+    m = MATCH_CONF_RE.search(message)
+    if m:
+        _add_to(bucket["match_conf"], float(m.group(1)))
+    if level in ("ERROR", "CRITICAL") or "Exception" in message:
+        bucket["errors"] += 1
+
+def parse_from(path, offset, buckets, window_minutes):
+    """Parse the complete lines of path after (uncompressed) byte offset; returns the new offset."""
+    with _open_log(path) as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break  # Still being written; picked up on the next run
+            offset += len(raw)
+            add_line(buckets, window_minutes, raw.decode("utf-8", errors="ignore").rstrip("\r\n"))
+    return offset
+
+def new_index(window_minutes):
+    return {"version": INDEX_VERSION, "window_minutes": window_minutes, "files": {}, "closed": [], "buckets": {}}
+
+def load_index(path, window_minutes):
+    """The saved index, or a fresh one if it is missing, unreadable or built for another window size."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION and index.get("window_minutes") == window_minutes:
+            return index
+    except (OSError, ValueError):
+        pass
+    return new_index(window_minutes)
+
+def save_index(path, index):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, path)
+
+def update_index(log_path, index_path, window_minutes=WINDOW_MINUTES, rebuild=False):
+    """Parse whatever was appended to the log and its backups since the last run. Returns (index, bytes read)."""
+    index = new_index(window_minutes) if rebuild else load_index(index_path, window_minutes)
+    read = 0
+    for path in log_files(log_path):
+        fingerprint = _fingerprint(path)
+        if fingerprint is None:
+            continue
+        if fingerprint in index["closed"]:
+            continue  # A compressed backup that was read to the end; it won't change any more
+        offset = index["files"].get(fingerprint, 0)
+        compressed = path.endswith(".gz")
+        if not compressed and offset > os.path.getsize(path):
+            offset = 0  # Same first line but a shorter file: not the file we indexed
+        new_offset = parse_from(path, offset, index["buckets"], window_minutes)
+        read += new_offset - offset
+        index["files"][fingerprint] = new_offset
+        if compressed:
+            index["closed"].append(fingerprint)
+    save_index(index_path, index)
+    return index, read
+
+def percentile(histogram, pct):
+    """Nearest-rank percentile of a duration histogram, to the resolution of its bins."""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    rank = int(round(pct / 100 * (total - 1)))
+    seen = 0
+    for key in sorted(histogram, key=int):
+        seen += histogram[key]
+        if seen > rank:
+            return round(_bin_value(key), 3)
+
+def _mean(aggregate):
+    count, total = aggregate
+    return total / count if count else None
+
+def summarize(index):
+    """One report row per window and thread, oldest window first."""
+    window_minutes = index["window_minutes"]
+    rows = []
+    for window in sorted(index["buckets"]):
+        for thread, b in sorted(index["buckets"][window].items()):
+            iterations = b["iterations"]
+            rows.append({
+                "window": window,
+                "thread": thread,
+                "lines": b["lines"],
+                "iterations": iterations,
+                "iterations_per_min": round(iterations / window_minutes, 3),
+                "p50_s": percentile(b["durations"], 50),
+                "p95_s": percentile(b["durations"], 95),
+                "p99_s": percentile(b["durations"], 99),
+                "clicks": b["clicks"],
+                "beeps": b["beeps"],
+                "ocr_conf_mean": _round(_mean(b["ocr_conf"])),
+                "match_conf_mean": _round(_mean(b["match_conf"])),
+                "errors": b["errors"],
+                "errors_per_iteration": _round(b["errors"] / iterations) if iterations else None,
+            })
+    return rows
+
+def _round(value, digits=3):
+    return None if value is None else round(value, digits)
+
+COLUMNS = ["window", "thread", "lines", "iterations", "iterations_per_min", "p50_s", "p95_s", "p99_s",
+           "clicks", "beeps", "ocr_conf_mean", "match_conf_mean", "errors", "errors_per_iteration"]
+
+def write_csv(rows, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def write_html(rows, path, log_path):
+    cell = lambda v: "" if v is None else html.escape(str(v))
+    body = "\n".join(
+        "<tr>" + "".join(f"<td>{cell(row[c])}</td>" for c in COLUMNS) + "</tr>" for row in rows
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Auto-clicker log stats</title>\n"
+            "<style>body{font-family:sans-serif}table{border-collapse:collapse}"
+            "td,th{border:1px solid #ccc;padding:2px 6px;text-align:right}</style></head><body>\n"
+            f"<h1>Auto-clicker log stats</h1><p>{html.escape(log_path)}, generated {time.strftime('%Y-%m-%d %H:%M:%S')}</p>\n"
+            "<table><tr>" + "".join(f"<th>{html.escape(c)}</th>" for c in COLUMNS) + "</tr>\n"
+            f"{body}\n</table></body></html>\n"
+        )
+
+def main():
+    from core.log_paths import default_log_path
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", default=default_log_path(), help="Live log file; its .1 .. .3 backups are read too")
+    parser.add_argument("--window", type=int, default=WINDOW_MINUTES, help="Window size in minutes")
+    parser.add_argument("--out-dir", help="Where to write log_stats.csv/.html (default: next to the log)")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the index and parse everything again")
+    args = parser.parse_args()
+
+    out_dir = args.out_dir or os.path.dirname(os.path.abspath(args.log))
+    os.makedirs(out_dir, exist_ok=True)
+    start = time.time()
+    index, read = update_index(args.log, os.path.join(out_dir, "log_stats_index.json"), max(1, args.window), args.rebuild)
+    rows = summarize(index)
+    csv_path = os.path.join(out_dir, "log_stats.csv")
+    html_path = os.path.join(out_dir, "log_stats.html")
+    write_csv(rows, csv_path)
+    write_html(rows, html_path, args.log)
+    print(f"✅ Parsed {read / 1e6:.2f} MB of new log data in {time.time() - start:.2f}s; "
+          f"{len(rows)} rows written to {csv_path} and {html_path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,132 @@
 import os
 import sys
+import gzip
+import queue
+import atexit
+import shutil
 import logging
-from logging.handlers import RotatingFileHandler
+import threading
+import multiprocessing
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from core.log_paths import LOG_DIR, LOG_FILE_NAME
+
+LOG_MAX_BYTES = 5*1024*1024
+LOG_BACKUP_COUNT = 3
+# Per-destination levels, overridable with AUTOCLICKER_FILE_LOG_LEVEL / AUTOCLICKER_CONSOLE_LOG_LEVEL
+FILE_LOG_LEVEL = os.environ.get("AUTOCLICKER_FILE_LOG_LEVEL", "DEBUG")
+CONSOLE_LOG_LEVEL = os.environ.get("AUTOCLICKER_CONSOLE_LOG_LEVEL", "INFO")
+
+_listener = None
+
+class LocalQueueHandler(QueueHandler):
+    """
+    Queues the record as is. The stock QueueHandler formats it in the
+    calling thread so it can be pickled; this queue stays in-process, so
+    the listener thread does all the formatting.
+    """
+
+    def prepare(self, record):
+        return record
+
+def _level(name, default):
+    level = logging.getLevelName(str(name).upper())
+    return level if isinstance(level, int) else default
+
+def _gzip_file(source, dest):
+    """Compress source into dest and remove source; dest only appears once it is complete."""
+    try:
+        tmp_path = dest + ".tmp"
+        with open(source, "rb") as f_in, gzip.open(tmp_path, "wb", compresslevel=6) as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.replace(tmp_path, dest)
+        os.remove(source)
+    except OSError as e:
+        sys.stderr.write(f"⚠️ Failed to compress rotated log {source}: {e}\n")
+
+def _gzip_namer(name):
+    return name + ".gz"
+
+def _gzip_rotator(source, dest):
+    """Move the full log aside (fast, on the listener thread) and gzip it on a separate thread."""
+    plain = dest[:-len(".gz")]
+    os.replace(source, plain)
+    try:
+        threading.Thread(target=_gzip_file, args=(plain, dest), name="LogCompressThread").start()
+    except RuntimeError:
+        _gzip_file(plain, dest)  # No new threads while the interpreter shuts down
+
+def _compress_leftovers(log_file):
+    """Backups left uncompressed by an exit during compression."""
+    for i in range(1, LOG_BACKUP_COUNT + 1):
+        plain = f"{log_file}.{i}"
+        if os.path.exists(plain) and not os.path.exists(plain + ".gz"):
+            threading.Thread(target=_gzip_file, args=(plain, plain + ".gz"), name="LogCompressThread").start()
 
 def setup_logging():
+    """
+    Configure the app logger. Records go through a QueueHandler, and a
+    QueueListener thread does the console and file writes, so scan threads
+    never wait on I/O. The file rotates at LOG_MAX_BYTES, and backups are
+    gzipped in the background (autoclicker.log.1.gz ...).
+    """
+    global _listener
+    logger = logging.getLogger(__name__)
     try:
-        documents_path = os.path.join(os.path.expanduser("~"), "Documents", "AutoClickerLogs")
-        os.makedirs(documents_path, exist_ok=True)
-        log_file = os.path.join(documents_path, "autoclicker.log")
-        with open(os.path.join(documents_path, "write_test.txt"), "w") as f:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        log_file = os.path.join(LOG_DIR, LOG_FILE_NAME)
+        with open(os.path.join(LOG_DIR, "write_test.txt"), "w") as f:
             f.write("test")
     except Exception as e:
         logger.warning(f"⚠️ Logging setup failed, falling back to local log file: {e}")
-        log_file = "autoclicker.log"
+        log_file = LOG_FILE_NAME
 
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.DEBUG)
+    if logger.handlers:
+        return logger, log_file
+
+    if multiprocessing.parent_process() is not None:
+        # An OCR pool worker, which re-imports main.py on Windows. It must not open the
+        # log file as well: while other processes hold it, rollover in the app fails.
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setLevel(logging.WARNING)
+        logger.addHandler(stream_handler)
+        return logger, log_file
+
+    file_level = _level(FILE_LOG_LEVEL, logging.DEBUG)
+    console_level = _level(CONSOLE_LOG_LEVEL, logging.INFO)
+    # Records below both levels are dropped in the calling thread, before they are queued
+    logger.setLevel(min(file_level, console_level))
 
     formatter = logging.Formatter(
         fmt="%(asctime)s [%(levelname)s] (%(threadName)s) [%(funcName)s] %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S"
     )
 
-    file_handler = RotatingFileHandler(log_file, maxBytes=5*1024*1024, backupCount=3, encoding='utf-8')
+    file_handler = RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+    file_handler.namer = _gzip_namer
+    file_handler.rotator = _gzip_rotator
     file_handler.setFormatter(formatter)
-    file_handler.setLevel(logging.DEBUG)
+    file_handler.setLevel(file_level)
 
     stream_handler = logging.StreamHandler(sys.stdout)
     stream_handler.setFormatter(formatter)
-    stream_handler.setLevel(logging.DEBUG)
+    stream_handler.setLevel(console_level)
 
-    if not logger.hasHandlers():
-        logger.addHandler(file_handler)
-        logger.addHandler(stream_handler)
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(LocalQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    _compress_leftovers(log_file)
 
     return logger, log_file
 
+def stop_logging():
+    """Write out everything still queued and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 logger, LOG_PATH = setup_logging()
 
 def except_hook(exctype, value, tb):
@@ -44,4 +135,4 @@ def except_hook(exctype, value, tb):
         window.log(f"🚨 Critical Error: {exctype.__name__} - {str(value)}. Check logs at {LOG_PATH} for details.")
     sys.__excepthook__(exctype, value, tb)
 
-sys.excepthook = except_hook
\ No newline at end of file
+sys.excepthook = except_hook
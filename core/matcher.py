@@ -0,0 +1,261 @@
+import threading
+import traceback
+import cv2
+import numpy as np
+from core.change_detector import bounding_box
+from core.buffers import frame_buffers, scaled_shape
+from core.logger import logger
+
+PYRAMID_MAX_LEVELS = 3       # At most 8x downscale for the coarse search
+PYRAMID_MIN_TEMPLATE = 12    # Smallest template side allowed at the coarsest level
+PYRAMID_CANDIDATES = 3       # Coarse peaks refined at full resolution
+# Template scales tried by a full sweep, e.g. for DPI or game-resolution differences
+SWEEP_SCALES = (0.5, 0.6, 0.7, 0.8, 0.9, 1.0, 1.1, 1.25, 1.4, 1.6, 1.8, 2.0)
+SCALE_MAX_MISSES = 5         # Misses at the cached scale before sweeping again
+
+def to_gray(image, tag=None):
+    """Grayscale view of image; with tag the result goes into a reused frame buffer."""
+    if image.ndim == 2:
+        return image
+    code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+    dst = frame_buffers.get(tag, image.shape[:2]) if tag else None
+    return cv2.cvtColor(image, code, dst=dst)
+
+def _pyramid_levels(template_width, template_height):
+    levels = 0
+    while (levels < PYRAMID_MAX_LEVELS and
+           min(template_width, template_height) >> (levels + 1) >= PYRAMID_MIN_TEMPLATE):
+        levels += 1
+    return levels
+
+def _coarse_peaks(result, count, floor, suppress_w, suppress_h):
+    """Up to count local maxima of result above floor, suppressing a template-sized area around each."""
+    peaks = []
+    scratch = frame_buffers.like("pyramid_peaks", result)
+    np.copyto(scratch, result)
+    result = scratch
+    for _ in range(count):
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val < floor:
+            break
+        peaks.append(max_loc)
+        x, y = max_loc
+        result[max(0, y - suppress_h):y + suppress_h + 1, max(0, x - suppress_w):x + suppress_w + 1] = -1
+    return peaks
+
+def pyramid_match(screenshot, template):
+    """
+    Coarse-to-fine TM_CCOEFF_NORMED on grayscale images: find candidate peaks
+    on a downscaled copy, then rescore a small full-resolution window around
+    each. Returns (max_val, max_loc) like cv2.minMaxLoc on a full match.
+    """
+    template_height, template_width = template.shape[:2]
+    levels = _pyramid_levels(template_width, template_height)
+    if levels == 0:
+        _, max_val, _, max_loc = cv2.minMaxLoc(cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED))
+        return max_val, max_loc
+
+    factor = 1 << levels
+    small_shape = scaled_shape(screenshot.shape, 1 / factor, 1 / factor)
+    small_screen = cv2.resize(screenshot, (small_shape[1], small_shape[0]), dst=frame_buffers.get("pyramid_screen", small_shape),
+                              interpolation=cv2.INTER_AREA)
+    small_template = cv2.resize(template, None, fx=1 / factor, fy=1 / factor, interpolation=cv2.INTER_AREA)
+    small_height, small_width = small_template.shape[:2]
+    result_shape = (small_shape[0] - small_height + 1, small_shape[1] - small_width + 1)
+    if result_shape[0] <= 0 or result_shape[1] <= 0:
+        return -1.0, (0, 0)
+    coarse = cv2.matchTemplate(small_screen, small_template, cv2.TM_CCOEFF_NORMED,
+                               result=frame_buffers.get("pyramid_result", result_shape, np.float32))
+    peaks = _coarse_peaks(coarse, PYRAMID_CANDIDATES, -1.0, small_width // 2, small_height // 2)
+
+    screen_height, screen_width = screenshot.shape[:2]
+    best_val, best_loc = -1.0, (0, 0)
+    for peak_x, peak_y in peaks:
+        # Window covers the template plus one coarse pixel of slack on each side
+        x0 = max(0, peak_x * factor - factor)
+        y0 = max(0, peak_y * factor - factor)
+        x1 = min(screen_width, peak_x * factor + template_width + factor)
+        y1 = min(screen_height, peak_y * factor + template_height + factor)
+        if x1 - x0 < template_width or y1 - y0 < template_height:
+            continue
+        fine = cv2.matchTemplate(screenshot[y0:y1, x0:x1], template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(fine)
+        if max_val > best_val:
+            best_val, best_loc = max_val, (x0 + max_loc[0], y0 + max_loc[1])
+    return best_val, best_loc
+
+class ScaleCache:
+    """
+    Remembers which template scale matched per (monitor geometry, template).
+    The first search sweeps SWEEP_SCALES. A scale that hits is kept, and
+    later searches try only it until it misses max_misses times in a row,
+    which triggers a new sweep. A sweep that finds nothing caches nothing,
+    since its best score is just noise; searches fall back to scale 1.0 and
+    sweep again after max_misses misses there.
+    """
+
+    def __init__(self, max_misses=SCALE_MAX_MISSES):
+        self.max_misses = max_misses
+        self._scales = {}
+        self._misses = {}
+        self._fallback = set()  # Keys whose last sweep missed, searched at 1.0 until the next sweep
+        self._lock = threading.Lock()
+
+    def scales_for(self, key):
+        with self._lock:
+            scale = self._scales.get(key)
+            if scale is None and key in self._fallback:
+                scale = 1.0
+        return (scale,) if scale is not None else SWEEP_SCALES
+
+    def record(self, key, scale, hit, swept):
+        with self._lock:
+            if hit:
+                if swept and self._scales.get(key) != scale:
+                    logger.debug(f"Scale sweep for {key} picked {scale:.2f}")
+                self._scales[key] = scale
+                self._fallback.discard(key)
+                self._misses[key] = 0
+                return
+            if swept:
+                self._fallback.add(key)  # Not a winning scale, just what to try until the next sweep
+                self._misses[key] = 0
+                return
+            self._misses[key] = self._misses.get(key, 0) + 1
+            if self._misses[key] >= self.max_misses:
+                logger.debug(f"Scale {self._scales.get(key, 1.0)} for {key} missed {self._misses[key]} times, sweeping again")
+                self._scales.pop(key, None)
+                self._fallback.discard(key)
+                self._misses[key] = 0
+
+    def clear(self):
+        with self._lock:
+            self._scales.clear()
+            self._misses.clear()
+            self._fallback.clear()
+
+scale_cache = ScaleCache()
+
+def _scaled(template, scale):
+    if scale == 1.0:
+        return template
+    interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+    return cv2.resize(template, None, fx=scale, fy=scale, interpolation=interpolation)
+
+def match_template(screenshot, template, monitor, confidence, log_func, name="template", scale_key=None):
+    """
+    Match one template against an already captured screenshot (BGR or gray)
+    with the grayscale pyramid matcher. With scale_key, the template is also
+    tried at the scales scale_cache picks for that key.
+    Returns (center_x, center_y, width, height) in desktop coordinates, or None.
+    """
+    screenshot_height, screenshot_width = screenshot.shape[:2]
+    if template.size == 0 or template.shape[0] <= 0 or template.shape[1] <= 0:
+        log_func(f"❌ Invalid template image: {name}, shape: {template.shape}")
+        logger.error(f"Invalid template image: {name}, shape: {template.shape}")
+        return None
+
+    scales = scale_cache.scales_for(scale_key) if scale_key is not None else (1.0,)
+    gray_screen, gray_template = to_gray(screenshot), to_gray(template)
+    best = None  # (max_val, max_loc, scale, width, height)
+    try:
+        for scale in scales:
+            candidate = _scaled(gray_template, scale)
+            template_height, template_width = candidate.shape[:2]
+            if template_width > screenshot_width or template_height > screenshot_height:
+                logger.debug(f"Template {name} at scale {scale:.2f} ({template_width}x{template_height}) exceeds screenshot ({screenshot_width}x{screenshot_height})")
+                continue
+            max_val, max_loc = pyramid_match(gray_screen, candidate)
+            if best is None or max_val > best[0]:
+                best = (max_val, max_loc, scale, template_width, template_height)
+    except cv2.error as e:
+        log_func(f"❌ OpenCV error during template matching for {name}: {e}\n{traceback.format_exc()}")
+        logger.error(f"OpenCV error during template matching for {name}: {e}\n{traceback.format_exc()}")
+        return None
+    except MemoryError:
+        log_func(f"❌ Memory error during template matching for {name}\n{traceback.format_exc()}")
+        logger.error(f"Memory error during template matching for {name}\n{traceback.format_exc()}")
+        return None
+
+    if best is None:
+        log_func(f"❌ Template {name} ({template.shape[1]}x{template.shape[0]}) exceeds screenshot ({screenshot_width}x{screenshot_height})")
+        logger.error(f"Template {name} ({template.shape[1]}x{template.shape[0]}) exceeds screenshot ({screenshot_width}x{screenshot_height})")
+        return None
+
+    max_val, max_loc, scale, template_width, template_height = best
+    log_func(f"🔍 {name} match confidence: {max_val:.3f} at scale {scale:.2f} (threshold: {confidence})")
+    logger.debug(f"{name} match confidence: {max_val:.3f} at location {max_loc}, scale {scale:.2f}")
+    hit = max_val >= confidence
+    if scale_key is not None:
+        scale_cache.record(scale_key, scale, hit, swept=len(scales) > 1)
+    if not hit:
+        return None
+    center_x = monitor["left"] + max_loc[0] + template_width // 2
+    center_y = monitor["top"] + max_loc[1] + template_height // 2
+    return (center_x, center_y, template_width, template_height)
+
+def match_templates(screenshot, templates, monitor, confidence, log_func):
+    """
+    Match every template in one pass over a single screenshot.
+    templates maps a name (usually the asset path) to a BGR image; the result
+    maps the same names to a hit tuple or None.
+    """
+    gray = to_gray(screenshot, "match_gray")
+    return {
+        name: match_template(gray, template, monitor, confidence, log_func, name, _scale_key(monitor, name))
+        for name, template in templates.items()
+    }
+
+def _scale_key(monitor, name):
+    return (monitor["width"], monitor["height"], name)
+
+def _hit_rect(hit, monitor):
+    """Convert a hit tuple back to an (x, y, w, h) rect in screenshot pixels."""
+    center_x, center_y, width, height = hit
+    return (center_x - monitor["left"] - width // 2, center_y - monitor["top"] - height // 2, width, height)
+
+def match_templates_incremental(screenshot, templates, monitor, confidence, log_func, detector):
+    """
+    Like match_templates, but uses a TileChangeDetector to skip work on static
+    frames. A template is only rematched inside the changed tiles (padded by
+    its own size) plus its previous hit; if nothing changed since the frame it
+    was last matched on, that earlier result is reused as is.
+
+    A previous miss only counts when it came from a full scale sweep and the
+    scale cache would sweep again. A miss at a single scale (cached, or the
+    1.0 fallback after a missed sweep) says nothing about other scales, so
+    the whole frame is matched again, which also lets the cache count the
+    miss and re-sweep.
+    """
+    key = (monitor["left"], monitor["top"], monitor["width"], monitor["height"])
+    gray = to_gray(screenshot, "match_gray")
+    dirty = detector.update(key, gray)
+    generation = detector.generation(key)
+    screenshot_height, screenshot_width = gray.shape[:2]
+
+    hits = {}
+    for name, template in templates.items():
+        scale_key = _scale_key(monitor, name)
+        swept = scale_cache.scales_for(scale_key) == SWEEP_SCALES  # A miss now means "at no scale"
+        previous = detector.results.get((key, name))  # (generation, hit, swept)
+        fresh = (previous is not None and previous[0] == generation - 1 and
+                 (previous[1] is not None or (previous[2] and swept)))
+        if fresh and not dirty:
+            logger.debug(f"{name}: frame unchanged, reusing previous result {previous[1]}")
+            hit, swept = previous[1], previous[2]
+        elif fresh:
+            # Pad by the largest size the template may be matched at
+            template_height, template_width = (int(d * max(SWEEP_SCALES)) + 1 for d in template.shape[:2])
+            rects = list(dirty)
+            if previous[1]:
+                rects.append(_hit_rect(previous[1], monitor))
+            x, y, w, h = bounding_box(rects, template_width, template_height, screenshot_width, screenshot_height)
+            logger.debug(f"{name}: {len(dirty)} changed tiles, matching inside {w}x{h} window at ({x}, {y})")
+            window = {"left": monitor["left"] + x, "top": monitor["top"] + y}
+            hit = match_template(gray[y:y + h, x:x + w], template, window, confidence, log_func, name, scale_key)
+            swept = swept and previous[2]  # The rest of the frame was covered by the previous search
+        else:
+            hit = match_template(gray, template, monitor, confidence, log_func, name, scale_key)
+        detector.results[(key, name)] = (generation, hit, swept)
+        hits[name] = hit
+    return hits
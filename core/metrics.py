@@ -0,0 +1,138 @@
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler, QueueListener
+from core.logger import logger, LOG_PATH, _gzip_namer, _gzip_rotator, _compress_leftovers
+
+METRICS_PATH = os.path.join(os.path.dirname(os.path.abspath(LOG_PATH)), "metrics.jsonl")
+METRICS_MAX_BYTES = 10*1024*1024
+METRICS_BACKUP_COUNT = 3
+
+class _MetricsFileHandler(RotatingFileHandler):
+    """Rotating metrics file that turns metrics off on the first write error instead of printing one per line."""
+
+    def __init__(self, writer, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer = writer
+
+    def handleError(self, record):
+        self.writer._disable(sys.exc_info()[1])
+
+class MetricsWriter:
+    """
+    Appends one JSON object per line to METRICS_PATH; safe to share between
+    scan threads. Lines are queued and written by a listener thread, as in
+    core.logger, so scan loops never wait on the disk. The file rotates at
+    max_bytes into gzipped backups (metrics.jsonl.1.gz ...).
+    """
+
+    def __init__(self, path=METRICS_PATH, max_bytes=METRICS_MAX_BYTES, backup_count=METRICS_BACKUP_COUNT):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._listener = None
+        self._handler = None
+        self._failed = False
+
+    def _start(self):
+        """Open the file and start the listener on first use, so importing this module writes nothing."""
+        try:
+            handler = _MetricsFileHandler(self, self.path, maxBytes=self.max_bytes,
+                                          backupCount=self.backup_count, encoding="utf-8")
+        except OSError as e:
+            self._disable(e)
+            return
+        handler.namer = _gzip_namer
+        handler.rotator = _gzip_rotator
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._handler = handler
+        self._listener = QueueListener(self._queue, handler)
+        self._listener.start()
+        atexit.register(self.close)
+        _compress_leftovers(self.path)
+
+    def _disable(self, error):
+        if not self._failed:
+            self._failed = True  # Don't retry (and log) on every iteration
+            logger.error(f"❌ Failed to write metrics to {self.path}, disabling metrics: {error}")
+
+    def write(self, record):
+        if self._failed:
+            return
+        line = json.dumps(record, separators=(",", ":"), default=str)
+        if self._listener is None:
+            with self._lock:
+                if self._listener is None and not self._failed:
+                    self._start()
+        self._queue.put(logging.makeLogRecord({"msg": line}))
+
+    def close(self):
+        """Write out everything still queued and close the file."""
+        with self._lock:
+            if self._listener is not None:
+                self._listener.stop()
+                self._listener = None
+                self._handler.close()
+                self._handler = None
+
+metrics_writer = MetricsWriter()
+
+class IterationTimer:
+    """
+    Collects per-stage timings for one scan iteration and emits them as a
+    single structured record, e.g.
+
+        timer = IterationTimer("image_search", iteration)
+        with timer.stage("capture"):
+            ...
+        timer.set(frame_width=w, frame_height=h, hit=True)
+        timer.emit()
+
+    Stage times are in milliseconds and add up if a stage is entered twice.
+    """
+
+    def __init__(self, loop, iteration, writer=None):
+        self.writer = writer or metrics_writer
+        self._start = time.perf_counter()
+        self.record = {
+            "ts": round(time.time(), 3),
+            "loop": loop,
+            "thread": threading.current_thread().name,
+            "iteration": iteration,
+            "stages_ms": {},
+        }
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            stages = self.record["stages_ms"]
+            stages[name] = round(stages.get(name, 0.0) + elapsed, 3)
+
+    def set(self, **fields):
+        self.record.update(fields)
+
+    def emit(self):
+        self.record["total_ms"] = round((time.perf_counter() - self._start) * 1000, 3)
+        self.writer.write(self.record)
+        return self.record
+
+@contextmanager
+def optional_stage(timer, name):
+    """timer.stage(name) when a timer is given, otherwise a no-op."""
+    if timer is None:
+        yield
+    else:
+        with timer.stage(name):
+            yield
@@ -1,16 +1,137 @@
+import os
+import time
+import atexit
+import threading
 import cv2
 import numpy as np
-from PIL import Image
 import pytesseract
 import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from core.ocr_engine import get_ocr_engine, init_ocr_worker
+from core.buffers import frame_buffers, scaled_shape
+from core.text_regions import measure_text_height
 from core.logger import logger
 
-def preprocess_image(image):
+OCR_BAND_OVERLAP = 64  # Rows shared by neighbouring bands so edge words are read whole
+TARGET_TEXT_HEIGHT = 36        # Word height (ascender to descender) Tesseract reads best, in pixels
+PASS_THROUGH_HEIGHTS = (24, 56)  # Measured heights OCR'd at their captured size
+PROFILE_SCALES = (0.5, 0.75, 1.5, 2.0, 3.0)  # Resize factors a profile can use, outside pass-through
+OTSU_MIN_SEPARABILITY = 0.8    # Otsu's between-class share of the variance needed to trust one global threshold
+ADAPTIVE_TILE = 4 * TARGET_TEXT_HEIGHT  # Tile edge for adaptive binarization, in pixels after resizing
+MIN_TILE_CONTRAST = 48         # Tiles with a smaller intensity range are blank background
+PROFILE_MAX_AGE = 300          # Seconds before a monitor's profile is measured again
+NO_TEXT_RETRY = 10             # Sooner when no text could be measured
+
+# How a frame is prepared for OCR: resize factor and binarization ("otsu" or "adaptive")
+PreprocessProfile = namedtuple("PreprocessProfile", ["name", "scale", "binarize"])
+DEFAULT_PROFILE = PreprocessProfile("upscale", 2.0, "otsu")  # Until text was measured: typical UI text is small
+
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+def otsu_separability(gray):
+    """Otsu's effectiveness measure: the share of gray's intensity variance explained by its best two-class split."""
+    hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+    total = hist.sum()
+    if not total:
+        return 0.0
+    p = hist / total
+    levels = np.arange(256)
+    omega = np.cumsum(p)
+    mu = np.cumsum(p * levels)
+    variance = float((p * (levels - mu[-1]) ** 2).sum())
+    if variance == 0:
+        return 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mu[-1] * omega - mu) ** 2 / (omega * (1 - omega))
+    return float(np.nanmax(between[:-1])) / variance
+
+def choose_profile(text_height, separability):
+    """
+    Profile that brings text of the measured height to about
+    TARGET_TEXT_HEIGHT: pass-through inside PASS_THROUGH_HEIGHTS, otherwise
+    the nearest of PROFILE_SCALES. Frames a single threshold splits cleanly
+    use Otsu, the rest adaptive binarization.
+    """
+    binarize = "otsu" if separability >= OTSU_MIN_SEPARABILITY else "adaptive"
+    if text_height is None:
+        return DEFAULT_PROFILE._replace(binarize=binarize)
+    if PASS_THROUGH_HEIGHTS[0] <= text_height <= PASS_THROUGH_HEIGHTS[1]:
+        return PreprocessProfile("pass", 1.0, binarize)
+    wanted = TARGET_TEXT_HEIGHT / text_height
+    scale = min(PROFILE_SCALES, key=lambda s: abs(np.log(s / wanted)))
+    return PreprocessProfile("downscale" if scale < 1 else "upscale", scale, binarize)
+
+class ProfileCache:
+    """Preprocessing profile per monitor, measured on a capture and kept for PROFILE_MAX_AGE seconds."""
+
+    def __init__(self):
+        self._profiles = {}  # key -> (profile, expires)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._profiles.get(key)
+        if entry is None or entry[1] < time.time():
+            return None
+        return entry[0]
+
+    def put(self, key, profile, max_age=PROFILE_MAX_AGE):
+        with self._lock:
+            self._profiles[key] = (profile, time.time() + max_age)
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+preprocess_profiles = ProfileCache()
+
+def measure_profile(gray):
+    """Measure gray's text height and contrast and return (profile, text_height)."""
+    text_height = measure_text_height(gray)
+    return choose_profile(text_height, otsu_separability(gray)), text_height
+
+def _binarize_tiles(gray, out, tile=ADAPTIVE_TILE):
+    """Otsu per tile; low-contrast tiles go to whichever side of the frame-wide Otsu split their mean falls on."""
+    height, width = gray.shape[:2]
+    split = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU, dst=out)[0]
+    for y in range(0, height, tile):
+        for x in range(0, width, tile):
+            src, dst = gray[y:y + tile, x:x + tile], out[y:y + tile, x:x + tile]
+            low, high, _, _ = cv2.minMaxLoc(src)
+            if high - low < MIN_TILE_CONTRAST:
+                dst.fill(255 if cv2.mean(src)[0] > split else 0)
+            else:
+                cv2.threshold(src, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU, dst=dst)
+
+def preprocess_image(image, profile=None):
+    """
+    Resize and binarize a frame for OCR as profile says (DEFAULT_PROFILE if
+    None). Adaptive binarization thresholds each tile with its own Otsu
+    split, which keeps text readable on uneven backgrounds (vignettes,
+    gradients, panels) where one global threshold loses part of it.
+    """
     try:
-        logger.debug(f"Preprocessing image with shape: {image.shape}")
-        gray = cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
-        upscaled = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
-        _, thresh = cv2.threshold(upscaled, 180, 255, cv2.THRESH_BINARY)
+        profile = profile or DEFAULT_PROFILE
+        logger.debug(f"Preprocessing image with shape: {image.shape}, profile: {profile}")
+        # Every stage writes into a per-thread buffer reused across iterations
+        if image.ndim == 2:
+            gray = image  # Already converted by the capture path
+        else:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY, dst=frame_buffers.get("ocr_gray", image.shape[:2]))
+        if profile.scale == 1.0:
+            scaled = gray
+        else:
+            shape = scaled_shape(gray.shape, profile.scale, profile.scale)
+            interpolation = cv2.INTER_AREA if profile.scale < 1 else cv2.INTER_CUBIC
+            scaled = cv2.resize(gray, (shape[1], shape[0]), dst=frame_buffers.get("ocr_scaled", shape),
+                                interpolation=interpolation)
+        thresh = frame_buffers.get("ocr_thresh", scaled.shape)
+        if profile.binarize == "adaptive":
+            _binarize_tiles(scaled, thresh)
+        else:
+            cv2.threshold(scaled, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU, dst=thresh)
         return thresh
     except Exception as e:
         logger.error(f"❌ Image preprocessing failed: {e}\n{traceback.format_exc()}")
@@ -18,28 +139,107 @@ def preprocess_image(image):
             window.log(f"🚨 Image processing error: {e}. Ensure OpenCV is installed and compatible.")
         return None
 
+def summarize_ocr_data(data):
+    """Collapse Output.DICT-style OCR data into (combined_text, average_confidence)."""
+    texts = data.get('text', [])
+    confidences = data.get('conf', [])
+
+    valid_confidences = []
+    for c in confidences:
+        try:
+            conf_value = float(c) if isinstance(c, (str, int, float)) and str(c).strip() != '-1' else None
+            if conf_value is not None and conf_value >= 0:
+                valid_confidences.append(conf_value)
+        except (ValueError, TypeError):
+            logger.warning(f"⚠️ Invalid confidence value skipped: {c}")
+            continue
+
+    avg_conf = sum(valid_confidences) / len(valid_confidences) if valid_confidences else 0.0
+    combined_text = ' '.join([t for t in texts if t.strip() != ''])
+    return combined_text, avg_conf
+
 def get_ocr_text_and_confidence(image):
     try:
-        data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-        texts = data.get('text', [])
-        confidences = data.get('conf', [])
-
-        valid_confidences = []
-        for c in confidences:
-            try:
-                conf_value = float(c) if isinstance(c, (str, int)) and str(c).strip() != '-1' else None
-                if conf_value is not None and conf_value >= 0:
-                    valid_confidences.append(conf_value)
-            except (ValueError, TypeError):
-                logger.warning(f"⚠️ Invalid confidence value skipped: {c}")
-                continue
-
-        avg_conf = sum(valid_confidences) / len(valid_confidences) if valid_confidences else 0.0
-        combined_text = ' '.join([t for t in texts if t.strip() != ''])
+        data = get_ocr_engine().image_to_data(image)
+        combined_text, avg_conf = summarize_ocr_data(data)
         logger.debug(f"✅ OCR completed with text: {combined_text}, confidence: {avg_conf:.2f}%")
         return combined_text, avg_conf
     except Exception as e:
         logger.error(f"❌ OCR failed: {e}\n{traceback.format_exc()}")
         if 'window' in globals() and hasattr(window, 'log'):
             window.log(f"🚨 OCR error: {e}. Verify Tesseract installation, image data, or restart the app.")
-        return "", 0.0
\ No newline at end of file
+        return "", 0.0
+
+def _ocr_band(band):
+    """Worker-process entry point: OCR one band with that process's own engine."""
+    return get_ocr_engine().image_to_data(band)
+
+def get_ocr_pool():
+    """Shared process pool for band OCR, sized to the available cores."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            workers = max(1, os.cpu_count() or 1)
+            _ocr_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=init_ocr_worker,
+                initargs=(pytesseract.pytesseract.tesseract_cmd,),
+            )
+            logger.info(f"✅ Started OCR process pool with {workers} workers")
+        return _ocr_pool
+
+def shutdown_ocr_pool():
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is not None:
+            _ocr_pool.shutdown(wait=False, cancel_futures=True)
+            _ocr_pool = None
+
+def split_into_bands(height, count, overlap=OCR_BAND_OVERLAP):
+    """
+    Split rows [0, height) into count bands. Returns (start, end, core_start, core_end)
+    per band: the band is OCR'd from start to end, and owns the words whose vertical
+    centre falls inside its core. Cores tile the image without gaps or overlap.
+    """
+    count = max(1, min(count, height // max(1, overlap * 2)))
+    bands = []
+    for i in range(count):
+        core_start = height * i // count
+        core_end = height * (i + 1) // count
+        bands.append((max(0, core_start - overlap), min(height, core_end + overlap), core_start, core_end))
+    return bands
+
+def get_ocr_text_and_confidence_parallel(image, bands=None):
+    """
+    OCR a preprocessed (numpy) frame as overlapping horizontal bands on the
+    process pool and merge the words back into (text, avg_conf), like
+    get_ocr_text_and_confidence. Words in an overlap are kept only by the band
+    whose core holds their vertical centre, so nothing is counted twice.
+    """
+    try:
+        image = np.asarray(image)
+        pool = get_ocr_pool()
+        layout = split_into_bands(image.shape[0], bands or max(1, os.cpu_count() or 1))
+        if len(layout) == 1:
+            return get_ocr_text_and_confidence(image)
+        futures = [pool.submit(_ocr_band, image[start:end]) for start, end, _, _ in layout]
+
+        merged = {'text': [], 'conf': []}
+        for (start, _, core_start, core_end), future in zip(layout, futures):
+            data = future.result()
+            tops, heights = data.get('top'), data.get('height')
+            for i, (text, conf) in enumerate(zip(data.get('text', []), data.get('conf', []))):
+                if tops is not None and heights is not None:
+                    centre = start + int(tops[i]) + int(heights[i]) // 2
+                    if not core_start <= centre < core_end:
+                        continue
+                merged['text'].append(text)
+                merged['conf'].append(conf)
+        combined_text, avg_conf = summarize_ocr_data(merged)
+        logger.debug(f"✅ Parallel OCR over {len(layout)} bands completed with text: {combined_text}, confidence: {avg_conf:.2f}%")
+        return combined_text, avg_conf
+    except Exception as e:
+        logger.error(f"❌ Parallel OCR failed, falling back to single pass: {e}\n{traceback.format_exc()}")
+        return get_ocr_text_and_confidence(image)
+
+atexit.register(shutdown_ocr_pool)
@@ -0,0 +1,168 @@
+import os
+import subprocess
+import threading
+import traceback
+import numpy as np
+import pytesseract
+from core.logger import logger
+from core.utils import TESSERACT_CMD
+
+OCR_LANG = "eng"
+if TESSERACT_CMD:
+    pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+
+TSV_INT_FIELDS = ("level", "page_num", "block_num", "par_num", "line_num", "word_num", "left", "top", "width", "height")
+
+def _parse_tsv(tsv):
+    """Tesseract's TSV output as a dict of columns, like pytesseract's Output.DICT."""
+    lines = tsv.splitlines()
+    if not lines:
+        return {"text": [], "conf": []}
+    header = lines[0].split("\t")
+    data = {name: [] for name in header}
+    for line in lines[1:]:
+        values = line.split("\t")
+        if len(values) < len(header):
+            values += [""] * (len(header) - len(values))
+        for name, value in zip(header, values):
+            if name in TSV_INT_FIELDS:
+                value = int(value)
+            elif name == "conf":
+                value = float(value)
+            data[name].append(value)
+    return data
+
+class PytesseractEngine:
+    """
+    Fallback engine: launches the tesseract executable for every image.
+    Gray uint8 arrays are piped to it on stdin as a PGM, i.e. a short header
+    plus the raw pixels; anything else goes through pytesseract, which
+    writes a temporary PNG.
+    """
+    name = "pytesseract"
+
+    def warm_up(self):
+        pass
+
+    def image_to_data(self, image):
+        if isinstance(image, np.ndarray) and image.ndim == 2 and image.dtype == np.uint8:
+            return self._gray_to_data(image)
+        return pytesseract.image_to_data(image, lang=OCR_LANG, output_type=pytesseract.Output.DICT)
+
+    def _gray_to_data(self, image):
+        height, width = image.shape
+        pgm = bytearray(b"P5\n%d %d\n255\n" % (width, height))
+        pgm += np.ascontiguousarray(image).data  # One copy of the pixels, straight behind the header
+        cmd = [pytesseract.pytesseract.tesseract_cmd, "stdin", "stdout", "-l", OCR_LANG, "tsv"]
+        try:
+            # Same hidden-console setup pytesseract uses on Windows
+            proc = subprocess.Popen(cmd, **pytesseract.pytesseract.subprocess_args())
+        except FileNotFoundError:
+            raise pytesseract.TesseractNotFoundError()
+        out, err = proc.communicate(pgm)
+        if proc.returncode:
+            raise pytesseract.TesseractError(proc.returncode, err.decode("utf-8", errors="ignore").strip())
+        return _parse_tsv(out.decode("utf-8", errors="ignore"))
+
+    def close(self):
+        pass
+
+class TesserocrEngine:
+    """
+    In-process engine built on the tesserocr binding. The language model is
+    loaded once when the engine is created and reused for every frame, so
+    there is no per-call process launch, temp file or TSV parsing.
+    """
+    name = "tesserocr"
+
+    def __init__(self, lang=OCR_LANG):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self._lock = threading.Lock()
+        path = _tessdata_path()
+        if path:
+            self._api = tesserocr.PyTessBaseAPI(path=path, lang=lang)
+        else:
+            self._api = tesserocr.PyTessBaseAPI(lang=lang)
+
+    def warm_up(self):
+        """Run one tiny recognition so the first real frame doesn't pay for lazy initialisation."""
+        self.image_to_data(np.full((32, 64), 255, dtype=np.uint8))
+
+    def image_to_data(self, image):
+        """
+        Return words, confidences and boxes in the same shape as pytesseract's
+        Output.DICT. uint8 arrays are handed over as raw pixels; SetImage
+        would encode a PIL image to an in-memory BMP first.
+        """
+        level = self._tesserocr.RIL.WORD
+        data = {"text": [], "conf": [], "left": [], "top": [], "width": [], "height": []}
+        with self._lock:
+            if isinstance(image, np.ndarray) and image.dtype == np.uint8 and image.ndim in (2, 3):
+                height, width = image.shape[:2]
+                channels = 1 if image.ndim == 2 else image.shape[2]
+                self._api.SetImageBytes(np.ascontiguousarray(image).tobytes(), width, height, channels, width * channels)
+            else:
+                self._api.SetImage(image)
+            self._api.Recognize()
+            iterator = self._api.GetIterator()
+            if iterator is not None:
+                for word in self._tesserocr.iterate_level(iterator, level):
+                    text = word.GetUTF8Text(level)
+                    if text is None:
+                        continue
+                    x1, y1, x2, y2 = word.BoundingBox(level)
+                    data["text"].append(text)
+                    data["conf"].append(word.Confidence(level))
+                    data["left"].append(x1)
+                    data["top"].append(y1)
+                    data["width"].append(x2 - x1)
+                    data["height"].append(y2 - y1)
+        return data
+
+    def close(self):
+        with self._lock:
+            self._api.End()
+
+def _tessdata_path():
+    """Locate tessdata next to the configured tesseract executable, if TESSDATA_PREFIX isn't set."""
+    if os.environ.get("TESSDATA_PREFIX"):
+        return None
+    cmd = pytesseract.pytesseract.tesseract_cmd
+    if os.path.isabs(cmd):
+        path = os.path.join(os.path.dirname(cmd), "tessdata")
+        if os.path.isdir(path):
+            return path
+    return None
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_ocr_engine():
+    """Return the shared OCR engine, creating it on first use. Prefers the resident tesserocr engine."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            try:
+                _engine = TesserocrEngine()
+                logger.info("✅ Using in-process tesserocr OCR engine")
+            except ImportError:
+                logger.info("tesserocr not installed, falling back to pytesseract")
+                _engine = PytesseractEngine()
+            except Exception as e:
+                logger.warning(f"⚠️ tesserocr engine failed to start, falling back to pytesseract: {e}\n{traceback.format_exc()}")
+                _engine = PytesseractEngine()
+        return _engine
+
+def init_ocr_worker(tesseract_cmd):
+    """ProcessPoolExecutor initializer: pass on the executable path, which may have been changed after import."""
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+def warm_up_ocr_engine():
+    """Create and warm up the shared engine; meant to run on a background thread at startup."""
+    try:
+        engine = get_ocr_engine()
+        engine.warm_up()
+        logger.info(f"✅ OCR engine '{engine.name}' warmed up")
+    except Exception as e:
+        logger.error(f"❌ OCR engine warm-up failed: {e}\n{traceback.format_exc()}")
@@ -0,0 +1,57 @@
+import threading
+from core.logger import logger
+
+ROI_WIDTH = 800        # Default box around the calibrated point, in screen pixels
+ROI_HEIGHT = 400
+ROI_MAX_MISSES = 5     # Misses in a row before one full-monitor scan
+ROI_GROWTH = 1.5       # Box growth when only the full-monitor scan found the phrase
+
+class RoiTracker:
+    """
+    Chooses the capture region for OCR: a box centred on the calibrated click
+    position, clipped to its monitor. After max_misses empty scans in a row
+    the next capture covers the whole monitor. If that full scan finds a
+    phrase the box was too small, so it grows for the following scans.
+    """
+
+    def __init__(self, pos, monitor, width=ROI_WIDTH, height=ROI_HEIGHT, max_misses=ROI_MAX_MISSES):
+        self.pos = pos
+        self.monitor = monitor
+        self.width = min(int(width), monitor["width"])
+        self.height = min(int(height), monitor["height"])
+        self.max_misses = max(1, int(max_misses))
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def box(self):
+        """The region of interest around pos, clipped to the monitor."""
+        left = self.pos.x - self.width // 2
+        top = self.pos.y - self.height // 2
+        left = max(self.monitor["left"], min(left, self.monitor["left"] + self.monitor["width"] - self.width))
+        top = max(self.monitor["top"], min(top, self.monitor["top"] + self.monitor["height"] - self.height))
+        return {"left": int(left), "top": int(top), "width": self.width, "height": self.height}
+
+    def is_full(self, region):
+        return (region["width"] >= self.monitor["width"] and region["height"] >= self.monitor["height"])
+
+    def region(self):
+        """Region to capture next: the ROI box, or the full monitor once misses run out."""
+        with self._lock:
+            if self.misses >= self.max_misses:
+                return dict(self.monitor)
+            return self.box()
+
+    def record(self, region, hit):
+        """Update the miss counter after scanning region."""
+        with self._lock:
+            full = self.is_full(region)
+            if hit:
+                if full and self.misses >= self.max_misses:
+                    self.width = min(int(self.width * ROI_GROWTH), self.monitor["width"])
+                    self.height = min(int(self.height * ROI_GROWTH), self.monitor["height"])
+                    logger.info(f"Phrase found only by full-monitor scan, growing ROI to {self.width}x{self.height}")
+                self.misses = 0
+            elif full:
+                self.misses = 0  # Nothing anywhere; go back to the small box
+            else:
+                self.misses += 1
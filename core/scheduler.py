@@ -0,0 +1,66 @@
+import time
+
+HIT_INTERVAL_FACTOR = 0.25  # Cadence right after a detection, as a fraction of the base interval
+MAX_INTERVAL_FACTOR = 2.0   # Slowest cadence after a long run of misses
+BACKOFF = 1.25              # Growth of the period per miss
+POLL_SLICE = 0.05           # Longest stretch spent waiting without checking stop/wake
+
+class ScanScheduler:
+    """
+    Fixed-rate scan cadence for the worker loops. Deadlines are spaced by
+    the current period from the previous deadline, not from when the work
+    finished, so a 10 s interval really means one scan every 10 s. A hit
+    tightens the period to HIT_INTERVAL_FACTOR x interval; each miss after
+    that stretches it by BACKOFF, up to MAX_INTERVAL_FACTOR x interval.
+
+    All waits return as soon as stop_event is set, and wait() also returns
+    early when wake_event is set. Every wait is multiplied by time_scale:
+    replays of a recorded session set it below 1, or to 0 to scan as fast
+    as frames can be processed (see replay_time_scale).
+    """
+
+    def __init__(self, interval, stop_event, wake_event=None,
+                 min_interval=None, max_interval=None, backoff=BACKOFF):
+        self.interval = interval
+        self.stop_event = stop_event
+        self.wake_event = wake_event
+        self.min_interval = min_interval if min_interval is not None else interval * HIT_INTERVAL_FACTOR
+        self.max_interval = max_interval if max_interval is not None else interval * MAX_INTERVAL_FACTOR
+        self.backoff = backoff
+        self.period = interval
+        self.time_scale = 1.0
+        self._deadline = None
+
+    def record(self, hit):
+        """Adjust the period after a scan: tighten on a hit, back off on a miss."""
+        if hit:
+            self.period = self.min_interval
+        else:
+            self.period = min(self.max_interval, max(self.period * self.backoff, self.min_interval))
+
+    def wait(self):
+        """
+        Wait for the next deadline. Returns False if stop_event was set,
+        True otherwise (deadline reached or woken early).
+        """
+        now = time.monotonic()
+        if self._deadline is None:
+            self._deadline = now
+        self._deadline += self.period * self.time_scale
+        if self._deadline < now:
+            # The scan overran a whole period; don't try to catch up with a burst
+            self._deadline = now
+        if self.wake_event is None:
+            return not self.stop_event.wait(max(0.0, self._deadline - now))
+        while not self.stop_event.is_set():
+            remaining = self._deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            if self.wake_event.wait(min(remaining, POLL_SLICE)):
+                self._deadline = time.monotonic()  # Restart the cadence from the early scan
+                return not self.stop_event.is_set()
+        return False
+
+    def sleep(self, seconds):
+        """Interruptible fixed delay; returns False if stop_event was set."""
+        return not self.stop_event.wait(seconds * self.time_scale)
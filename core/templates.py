@@ -0,0 +1,95 @@
+import os
+import threading
+import traceback
+import cv2
+from core.logger import logger
+
+class TemplateRegistry:
+    """
+    Keeps decoded reference images in memory so the Image Search loop never
+    touches the disk once warmed up. Each asset is decoded once and a copy
+    fitted to every monitor geometry it is used on is kept alongside it.
+    Entries are dropped when the file's mtime or the monitor layout changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sources = {}  # path -> (mtime, image)
+        self._fitted = {}   # (path, width, height) -> (mtime, image)
+        self._layout = None
+
+    def set_layout(self, monitors):
+        """Forget every fitted copy if the set of monitor geometries changed."""
+        layout = tuple((m["left"], m["top"], m["width"], m["height"]) for m in monitors)
+        with self._lock:
+            if layout != self._layout:
+                if self._layout is not None:
+                    logger.info(f"Monitor layout changed from {self._layout} to {layout}, clearing fitted templates")
+                self._layout = layout
+                self._fitted.clear()
+
+    def clear(self):
+        with self._lock:
+            self._sources.clear()
+            self._fitted.clear()
+
+    def get(self, image_path, monitor, log_func):
+        """Return the template for image_path scaled down to fit monitor, or None if it can't be loaded."""
+        try:
+            mtime = os.path.getmtime(image_path)
+        except OSError:
+            log_func(f"❌ Image file does not exist: {image_path}")
+            logger.error(f"Image file does not exist: {image_path}")
+            return None
+
+        key = (image_path, monitor["width"], monitor["height"])
+        with self._lock:
+            entry = self._fitted.get(key)
+            if entry and entry[0] == mtime:
+                return entry[1]
+
+        source = self._load_source(image_path, mtime, log_func)
+        if source is None:
+            return None
+        fitted = self._fit(image_path, source, monitor["width"], monitor["height"], log_func)
+        if fitted is None:
+            return None
+        with self._lock:
+            self._fitted[key] = (mtime, fitted)
+        return fitted
+
+    def _load_source(self, image_path, mtime, log_func):
+        with self._lock:
+            entry = self._sources.get(image_path)
+            if entry and entry[0] == mtime:
+                return entry[1]
+        img = cv2.imread(image_path, cv2.IMREAD_COLOR)
+        if img is None or img.size == 0:
+            log_func(f"❌ Failed to load image: {image_path}")
+            logger.error(f"Failed to load image: {image_path}")
+            return None
+        height, width = img.shape[:2]
+        log_func(f"📏 Loaded template {image_path}: {width}x{height}")
+        logger.debug(f"Loaded template {image_path} (mtime {mtime}): {width}x{height}")
+        with self._lock:
+            self._sources[image_path] = (mtime, img)
+        return img
+
+    def _fit(self, image_path, img, max_width, max_height, log_func):
+        """Resize img to fit within max_width and max_height while maintaining aspect ratio."""
+        try:
+            height, width = img.shape[:2]
+            if width <= max_width and height <= max_height:
+                return img
+            scale = min(max_width / width, max_height / height)
+            new_width = max(1, int(width * scale))
+            new_height = max(1, int(height * scale))
+            log_func(f"🔄 Resizing {image_path} from {width}x{height} to {new_width}x{new_height}")
+            logger.info(f"Resizing {image_path} from {width}x{height} to {new_width}x{new_height}")
+            return cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_AREA)
+        except Exception as e:
+            log_func(f"❌ Error resizing image {image_path}: {e}\n{traceback.format_exc()}")
+            logger.error(f"Error resizing image {image_path}: {e}\n{traceback.format_exc()}")
+            return None
+
+template_registry = TemplateRegistry()
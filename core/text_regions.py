@@ -0,0 +1,144 @@
+import cv2
+import numpy as np
+from core.buffers import frame_buffers, scaled_shape
+
+PROPOSAL_SCALE = 0.5        # Proposals are computed on the frame shrunk by this factor
+MIN_EDGE_STRENGTH = 24      # Floor for the Otsu threshold on the gradient, so flat frames don't turn into noise
+MIN_TEXT_HEIGHT = 6         # Component height range, in screen pixels, that can be a line of text
+MAX_TEXT_HEIGHT = 160
+MIN_TEXT_WIDTH = 8
+MAX_ASPECT = 40             # Wider than this per pixel of height is a rule or progress bar, not a word
+MIN_FILL = 0.3              # Share of a component's box it actually covers; panel outlines score far lower
+REGION_PADDING = 6          # Screen pixels added around each box so the outer glyphs are read whole
+MERGE_GAP = 16              # Words on one line closer than this are OCR'd as one box
+MAX_REGIONS = 96
+MAX_COVERAGE = 0.5          # Past this share of the frame, OCR'ing the whole frame is cheaper
+MEASURE_HEIGHT = 10         # Shrunken-pixel text height measure_text_height rescales large text to
+MOSAIC_GAP = 16             # Background pixels between regions packed into one OCR image
+
+_gradient_kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+_link_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (7, 1))  # Joins the glyphs of a word, not lines
+
+def _find_words(gray, scale):
+    """
+    Word-like components of gray, found on a copy shrunk by scale: a
+    morphological gradient marks glyph edges, a short horizontal close joins
+    the glyphs of a word, and components whose size and density fit text
+    are kept. Returns their (x, y, w, h) rows in shrunken pixels and the
+    shrunken shape.
+    """
+    small_shape = scaled_shape(gray.shape, scale, scale)
+    small = cv2.resize(gray, (small_shape[1], small_shape[0]), dst=frame_buffers.get("text_small", small_shape),
+                       interpolation=cv2.INTER_AREA)
+    gradient = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, _gradient_kernel,
+                                dst=frame_buffers.get("text_gradient", small_shape))
+    edges = frame_buffers.get("text_edges", small_shape)
+    otsu, _ = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU, dst=edges)
+    if otsu < MIN_EDGE_STRENGTH:
+        cv2.threshold(gradient, MIN_EDGE_STRENGTH, 255, cv2.THRESH_BINARY, dst=edges)
+    linked = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, _link_kernel, dst=frame_buffers.get("text_linked", small_shape))
+    _, _, stats, _ = cv2.connectedComponentsWithStats(linked, connectivity=8)
+
+    # Text height, not a thin rule, dense with edges
+    x, y, w, h, area = (stats[1:, i] for i in range(5))
+    fh, fw = h / scale, w / scale
+    keep = ((fh >= MIN_TEXT_HEIGHT) & (fh <= MAX_TEXT_HEIGHT) & (fw >= MIN_TEXT_WIDTH) &
+            (fw <= MAX_ASPECT * fh) & (area >= MIN_FILL * w * h))
+    return stats[1:, :4][keep], small_shape
+
+def measure_text_height(gray, scale=PROPOSAL_SCALE):
+    """
+    Median height in frame pixels of the word-like components of gray, or
+    None if it has none. Large text is measured again on a copy shrunk until
+    it is about MEASURE_HEIGHT pixels tall, since the word linking is tuned
+    for small glyphs and splits big words into letters.
+    """
+    words, _ = _find_words(gray, scale)
+    if not len(words):
+        return None
+    text_height = float(np.median(words[:, 3])) / scale
+    remeasure = MEASURE_HEIGHT / text_height
+    if remeasure < scale:
+        words, _ = _find_words(gray, remeasure)
+        if len(words):
+            text_height = float(np.median(words[:, 3])) / remeasure
+    return text_height
+
+def propose_text_regions(gray, scale=PROPOSAL_SCALE):
+    """
+    Find the parts of a gray frame that look like text and return them as
+    (x, y, w, h) boxes in frame pixels, top to bottom. Returns None when the
+    candidates cover so much of the frame (or are so many) that OCR'ing it
+    whole is the better deal.
+
+    Works on a shrunken copy: the word-like components (see _find_words)
+    of a line are joined into one box.
+    """
+    height, width = gray.shape[:2]
+    found, small_shape = _find_words(gray, scale)
+    # Words of one line become one box: paint them, join what is closer than MERGE_GAP and grow
+    # the result by REGION_PADDING, so boxes that would overlap come out as one
+    words = frame_buffers.get("text_words", small_shape)
+    words.fill(0)
+    for wx, wy, ww, wh in found:
+        words[wy:wy + wh, wx:wx + ww] = 255
+    gap = max(1, int(MERGE_GAP * scale))
+    pad = max(1, int(REGION_PADDING * scale))
+    lines = cv2.morphologyEx(words, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (gap, 1)),
+                             dst=frame_buffers.get("text_lines", small_shape))
+    cv2.dilate(lines, cv2.getStructuringElement(cv2.MORPH_RECT, (2 * pad + 1, 2 * pad + 1)), dst=lines)
+    _, _, stats, _ = cv2.connectedComponentsWithStats(lines, connectivity=4)
+
+    boxes = []
+    for lx, ly, lw, lh, _ in stats[1:]:
+        x0, y0 = int(lx / scale), int(ly / scale)
+        x1, y1 = min(width, int(np.ceil((lx + lw) / scale))), min(height, int(np.ceil((ly + lh) / scale)))
+        boxes.append((x0, y0, x1 - x0, y1 - y0))
+    boxes.sort(key=lambda r: (r[1], r[0]))
+    if len(boxes) > MAX_REGIONS or sum(w * h for _, _, w, h in boxes) > MAX_COVERAGE * width * height:
+        return None
+    return boxes
+
+def pack_regions(regions, gap=MOSAIC_GAP):
+    """
+    Shelf-pack region sizes in reading order into a roughly 2:1 image.
+    Returns (width, height, slots) with one (x, y, slot_w, slot_h) per
+    region: the region sits at the slot's top left and the rest of the slot
+    is padding, so the slots tile the image.
+    """
+    area = sum((w + gap) * (h + gap) for _, _, w, h in regions)
+    width = max(max(w for _, _, w, _ in regions), int((2 * area) ** 0.5))
+    shelves = []  # [top, height, [(region index, x)]]
+    x = width
+    for i, (_, _, w, h) in enumerate(regions):
+        if x + w > width:
+            top = shelves[-1][0] + shelves[-1][1] + gap if shelves else 0
+            shelves.append([top, 0, []])
+            x = 0
+        shelf = shelves[-1]
+        shelf[1] = max(shelf[1], h)
+        shelf[2].append((i, x))
+        x += w + gap
+    height = shelves[-1][0] + shelves[-1][1]
+    slots = [None] * len(regions)
+    for n, (top, shelf_h, placed) in enumerate(shelves):
+        slot_h = shelf_h + gap if n < len(shelves) - 1 else shelf_h
+        for k, (i, x) in enumerate(placed):
+            right = placed[k + 1][1] if k < len(placed) - 1 else width
+            slots[i] = (x, top, right - x, slot_h)
+    return width, height, slots
+
+def build_mosaic(gray, regions, gap=MOSAIC_GAP):
+    """
+    Pack the regions of gray into one image (see pack_regions) so they go
+    through preprocessing and OCR in a single pass. Padding repeats each
+    region's last column and row, which are background thanks to
+    REGION_PADDING.
+    """
+    width, height, slots = pack_regions(regions, gap)
+    mosaic = frame_buffers.get("text_mosaic", (height, width))
+    for (x, y, w, h), (sx, sy, slot_w, slot_h) in zip(regions, slots):
+        mosaic[sy:sy + h, sx:sx + w] = gray[y:y + h, x:x + w]
+        mosaic[sy:sy + h, sx + w:sx + slot_w] = mosaic[sy:sy + h, sx + w - 1:sx + w]
+        mosaic[sy + h:sy + slot_h, sx:sx + slot_w] = mosaic[sy + h - 1:sy + h, sx:sx + slot_w]
+    return mosaic
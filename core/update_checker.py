@@ -1,86 +1,137 @@
+import os
 import json
 import threading
 import time
+import urllib.error
 import urllib.request
 import webbrowser
 from PyQt6.QtWidgets import QMessageBox
 from PyQt6.QtCore import pyqtSignal, QObject
+from core.logger import LOG_PATH
 
 APP_VERSION = "3.1"  # Current version of the app
-UPDATE_URL = "https://raw.githubusercontent.com/regisgambiza/AutoClickerApp/refs/heads/main/update.json"
+# AUTOCLICKER_UPDATE_URL points the checker at another server, e.g. a local stand-in for testing
+UPDATE_URL = os.environ.get("AUTOCLICKER_UPDATE_URL", "https://raw.githubusercontent.com/regisgambiza/AutoClickerApp/refs/heads/main/update.json")
+UPDATE_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(LOG_PATH)), "update_cache.json")
+CACHE_TTL = 900          # A cached result younger than this is used without asking the server
+CHECK_INTERVAL = 300     # Period of the background check loop
+REQUEST_TIMEOUT = 10
+
+class UpdateCache:
+    """
+    Last known update.json with the validators the server sent for it, so
+    a recheck can be a conditional request that usually comes back as 304.
+    """
+
+    def __init__(self, path=UPDATE_CACHE_PATH):
+        self.path = path
+        self.data = None
+        self.etag = None
+        self.last_modified = None
+        self.checked_at = 0.0
+        try:
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+            self.data = saved.get("data")
+            self.etag = saved.get("etag")
+            self.last_modified = saved.get("last_modified")
+            self.checked_at = float(saved.get("checked_at", 0.0))
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass
+
+    def is_fresh(self, ttl=CACHE_TTL):
+        return self.data is not None and time.time() - self.checked_at < ttl
+
+    def save(self):
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({"data": self.data, "etag": self.etag, "last_modified": self.last_modified,
+                           "checked_at": self.checked_at}, f)
+        except OSError:
+            pass  # Only costs a network round trip next time
+
+def fetch_update_info(cache, url=UPDATE_URL, ttl=CACHE_TTL, timeout=REQUEST_TIMEOUT):
+    """
+    Return update.json as a dict. Uses the cached copy while it is younger
+    than ttl, otherwise revalidates it with If-None-Match/If-Modified-Since.
+    If the server can't be reached the last known copy is returned; with no
+    copy at all the error is raised.
+    """
+    if cache.is_fresh(ttl):
+        return cache.data
+    request = urllib.request.Request(url)
+    if cache.data is not None:
+        if cache.etag:
+            request.add_header("If-None-Match", cache.etag)
+        if cache.last_modified:
+            request.add_header("If-Modified-Since", cache.last_modified)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            cache.data = json.loads(response.read().decode())
+            cache.etag = response.headers.get("ETag")
+            cache.last_modified = response.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code != 304:
+            if cache.data is None:
+                raise
+            return cache.data
+        # 304 Not Modified: the cached copy is still current
+    except Exception:
+        if cache.data is None:
+            raise
+        return cache.data
+    cache.checked_at = time.time()
+    cache.save()
+    return cache.data
 
 class UpdateChecker(QObject):
     update_available = pyqtSignal(str, str, str)  # Signal for version, changelog, download_url
 
-    def __init__(self, main_window, log_func):
+    def __init__(self, main_window, log_func, url=UPDATE_URL, cache=None):
         super().__init__()
         self.main_window = main_window
         self.log_func = log_func
+        self.url = url
+        self.cache = cache or UpdateCache()
         self.update_available.connect(self.show_update_dialog)
 
-    def initial_check(self):
-        """Perform a synchronous version check at startup."""
+    def check_once(self):
+        """One check against the cache or server; emits update_available and returns True if an update is out."""
         try:
-            self.log_func("⏳ Performing initial version check...")
-            with urllib.request.urlopen(UPDATE_URL, timeout=10) as response:
-                data = json.loads(response.read().decode())
-                latest_version = data["latest_version"]
-                self.log_func(f"✅ Initial check: Latest version is v{latest_version}")
-                if latest_version > APP_VERSION:
-                    self.log_func(f"🚨 New version v{latest_version} available.")
-                    changelog = data.get("changelog", "")
-                    download_url = data.get("download_url")
-                    self.update_available.emit(latest_version, changelog, download_url)
-                    return True  # Update found, app will close
-                return False  # No update, continue running
+            self.log_func("⏳ Checking for updates...")
+            data = fetch_update_info(self.cache, self.url)
+            latest_version = data["latest_version"]
+            if latest_version > APP_VERSION:
+                self.log_func(f"🚨 New version v{latest_version} available.")
+                changelog = data.get("changelog", "")
+                download_url = data.get("download_url")
+                self.update_available.emit(latest_version, changelog, download_url)
+                return True  # Update found
+            else:
+                self.log_func("✅ You are using the latest version.")
         except Exception as e:
-            self.log_func(f"🌐 Initial version check failed: {e}")
-            QMessageBox.critical(
-                self.main_window,
-                "Network Error",
-                f"Failed to check for updates: {e}\n\nPlease ensure you have an internet connection and try again."
-            )
-            self.log_func("🔒 Application is exiting due to failed version check.")
-            self.main_window.close()
-            return True  # Terminate app
+            self.log_func(f"🌐 No network or failed to check for updates: {e}")
+        return False
 
     def check_update_loop(self):
-        """Start with an initial check, then run periodic async checks."""
-        # Perform initial synchronous check
-        if self.initial_check():
-            return  # App will close if update found or check failed
-
-        # Start asynchronous update loop
-        def check_once():
-            try:
-                self.log_func("⏳ Checking for updates...")
-                with urllib.request.urlopen(UPDATE_URL, timeout=10) as response:
-                    data = json.loads(response.read().decode())
-                    latest_version = data["latest_version"]
-                    if latest_version > APP_VERSION:
-                        self.log_func(f"🚨 New version v{latest_version} available.")
-                        changelog = data.get("changelog", "")
-                        download_url = data.get("download_url")
-                        self.update_available.emit(latest_version, changelog, download_url)
-                        return True  # Update found
-                    else:
-                        self.log_func("✅ You are using the latest version.")
-            except Exception as e:
-                self.log_func(f"🌐 No network or failed to check for updates: {e}")
-            return False
-
+        """
+        Run the version checks on a background thread so the window is usable
+        immediately. Every CHECK_INTERVAL seconds the loop checks again through
+        the same cache, which only goes to the server once it is older than
+        CACHE_TTL.
+        """
         def update_loop():
             while True:
-                updated = check_once()
+                updated = self.check_once()
                 if updated:
                     break
-                time.sleep(300)  # Retry every 5 minutes
+                time.sleep(CHECK_INTERVAL)
 
-        threading.Thread(target=update_loop, daemon=True).start()
+        threading.Thread(target=update_loop, name="UpdateCheckThread", daemon=True).start()
 
     def show_update_dialog(self, version, changelog, download_url):
         msg = f"A new version (v{version}) is available!\n\nChangelog:\n{changelog}\n\nYou must update to continue."
         QMessageBox.critical(self.main_window, "Update Required", msg)
         webbrowser.open(download_url)
         self.log_func("🔒 Application is exiting until updated.")
-        self.main_window.close()
\ No newline at end of file
+        self.main_window.close()
@@ -1,16 +1,19 @@
 import os
 import platform
 import json
-import pytesseract
-import mss
-import pyautogui
+from collections import namedtuple
 from core.logger import logger
 
+# Same fields and repr as pyautogui.Point, without importing pyautogui at startup
+Point = namedtuple("Point", ["x", "y"])
+
+# Applied to pytesseract by core.ocr_engine, so pytesseract is only imported once OCR is used
+TESSERACT_CMD = None
 tesseract_found = True
 if platform.system() == "Windows":
     t_path = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
     if os.path.exists(t_path):
-        pytesseract.pytesseract.tesseract_cmd = t_path
+        TESSERACT_CMD = t_path
     else:
         tesseract_found = False
         logger.warning("❌ Tesseract not found at default path. Please install Tesseract-OCR and set the path correctly.")
@@ -18,7 +21,7 @@ if platform.system() == "Windows":
             window.log("⚠️ Tesseract not detected. Install it at C:\\Program Files\\Tesseract-OCR\\tesseract.exe to enable OCR.")
 
 SETTINGS_FILE = "settings.json"
-DEFAULT_COORDS = pyautogui.Point(x=914, y=611)  # Default coordinates
+DEFAULT_COORDS = Point(x=914, y=611)  # Default coordinates
 DEFAULT_MONITOR_INDEX = 1  # Default to primary monitor
 
 def validate_coords(pos, monitor):
@@ -34,8 +37,13 @@ def validate_coords(pos, monitor):
 
 def save_settings(pos, monitor):
     try:
+        data = {"x": pos.x, "y": pos.y, "monitor": monitor}
+        saved = _read_settings_file()
+        for key in ("roi", "capture", "ocr"):
+            if saved.get(key):
+                data[key] = saved[key]  # Keep hand-tuned settings across recalibration
         with open(SETTINGS_FILE, "w") as f:
-            json.dump({"x": pos.x, "y": pos.y, "monitor": monitor}, f)
+            json.dump(data, f)
         logger.info(f"✅ Settings saved for position {pos} on monitor {monitor}")
     except Exception as e:
         logger.error(f"❌ Failed to save settings: {e}")
@@ -45,6 +53,7 @@ def save_settings(pos, monitor):
 def load_settings():
     # Try default coordinates first
     try:
+        import mss
         with mss.mss() as sct:
             monitors = sct.monitors
             if DEFAULT_MONITOR_INDEX < len(monitors):
@@ -64,7 +73,7 @@ def load_settings():
         try:
             with open(SETTINGS_FILE) as f:
                 data = json.load(f)
-                pos = pyautogui.Point(data["x"], data["y"])
+                pos = Point(data["x"], data["y"])
                 monitor = data["monitor"]
                 if validate_coords(pos, monitor):
                     logger.info(f"✅ Loaded settings: position {pos}, monitor {monitor}")
@@ -82,6 +91,67 @@ def load_settings():
         window.log("⚠️ No valid coordinates found. Please calibrate the app.")
     return None, None
 
+def _read_settings_file():
+    try:
+        with open(SETTINGS_FILE) as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def load_roi_settings():
+    """
+    Optional "roi" block in settings.json, e.g. {"width": 800, "height": 400, "max_misses": 5}.
+    Returns keyword arguments for RoiTracker.
+    """
+    from core.roi import ROI_WIDTH, ROI_HEIGHT, ROI_MAX_MISSES
+    roi = _read_settings_file().get("roi") or {}
+    try:
+        return {
+            "width": int(roi.get("width", ROI_WIDTH)),
+            "height": int(roi.get("height", ROI_HEIGHT)),
+            "max_misses": int(roi.get("max_misses", ROI_MAX_MISSES)),
+        }
+    except (TypeError, ValueError, AttributeError) as e:
+        logger.warning(f"⚠️ Invalid ROI settings {roi}, using defaults: {e}")
+        return {"width": ROI_WIDTH, "height": ROI_HEIGHT, "max_misses": ROI_MAX_MISSES}
+
+def load_capture_settings():
+    """
+    Optional "capture" block in settings.json, e.g. {"record": "session.acsr"}
+    to record the session or {"replay": "session.acsr", "loop": false} to scan
+    a recorded session instead of the screen. A replay runs as fast as the
+    frames are processed unless "speed" is set, e.g. 1 for the live cadence.
+    """
+    capture = _read_settings_file().get("capture")
+    if not isinstance(capture, dict):
+        capture = {}
+    try:
+        speed = max(0.0, float(capture.get("speed", 0)))
+    except (TypeError, ValueError) as e:
+        logger.warning(f"⚠️ Invalid replay speed {capture.get('speed')}, replaying at full speed: {e}")
+        speed = 0.0
+    return {
+        "record": capture.get("record") or None,
+        "replay": capture.get("replay") or None,
+        "loop": bool(capture.get("loop", False)),
+        "speed": speed,
+    }
+
+def load_ocr_settings():
+    """
+    Optional "ocr" block in settings.json, e.g. {"parallel": true} to OCR
+    full-monitor captures as bands on a process pool, one tesseract per core,
+    or {"text_regions": true} to OCR only the text-like parts of a frame.
+    Both are off by default.
+    """
+    ocr = _read_settings_file().get("ocr")
+    if not isinstance(ocr, dict):
+        ocr = {}
+    return {
+        "parallel": bool(ocr.get("parallel", False)),
+        "text_regions": bool(ocr.get("text_regions", False)),
+    }
+
 if platform.system() == "Windows":
     import winsound
     def beep(): winsound.Beep(1000, 300)
@@ -0,0 +1,58 @@
+# Form implementation generated from reading ui file 'gui.ui'
+#
+# Created by: PyQt6 UI code generator 6.11.0
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic6 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+
+class Ui_AutoClickerApp(object):
+    def setupUi(self, AutoClickerApp):
+        AutoClickerApp.setObjectName("AutoClickerApp")
+        AutoClickerApp.resize(480, 320)
+        self.verticalLayout = QtWidgets.QVBoxLayout(AutoClickerApp)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.horizontalLayout = QtWidgets.QHBoxLayout()
+        self.horizontalLayout.setObjectName("horizontalLayout")
+        self.btn_start = QtWidgets.QPushButton(parent=AutoClickerApp)
+        self.btn_start.setObjectName("btn_start")
+        self.horizontalLayout.addWidget(self.btn_start)
+        self.btn_stop = QtWidgets.QPushButton(parent=AutoClickerApp)
+        self.btn_stop.setObjectName("btn_stop")
+        self.horizontalLayout.addWidget(self.btn_stop)
+        self.btn_calibrate = QtWidgets.QPushButton(parent=AutoClickerApp)
+        self.btn_calibrate.setEnabled(True)
+        self.btn_calibrate.setObjectName("btn_calibrate")
+        self.horizontalLayout.addWidget(self.btn_calibrate)
+        self.btn_open_log = QtWidgets.QPushButton(parent=AutoClickerApp)
+        self.btn_open_log.setObjectName("btn_open_log")
+        self.horizontalLayout.addWidget(self.btn_open_log)
+        self.verticalLayout.addLayout(self.horizontalLayout)
+        self.search_method_combo = QtWidgets.QComboBox(parent=AutoClickerApp)
+        self.search_method_combo.setObjectName("search_method_combo")
+        self.search_method_combo.addItem("")
+        self.search_method_combo.addItem("")
+        self.verticalLayout.addWidget(self.search_method_combo)
+        self.status = QtWidgets.QTextEdit(parent=AutoClickerApp)
+        self.status.setObjectName("status")
+        self.verticalLayout.addWidget(self.status)
+
+        self.retranslateUi(AutoClickerApp)
+        QtCore.QMetaObject.connectSlotsByName(AutoClickerApp)
+
+    def retranslateUi(self, AutoClickerApp):
+        _translate = QtCore.QCoreApplication.translate
+        AutoClickerApp.setWindowTitle(_translate("AutoClickerApp", "Auto Clicker by Regis"))
+        self.btn_start.setText(_translate("AutoClickerApp", "▶️ Start"))
+        self.btn_stop.setText(_translate("AutoClickerApp", "⏹️ Stop"))
+        self.btn_calibrate.setText(_translate("AutoClickerApp", "🧭 Calibrate"))
+        self.btn_open_log.setText(_translate("AutoClickerApp", "🧾 Open Log Folder"))
+        self.search_method_combo.setItemText(0, _translate("AutoClickerApp", "Image Search"))
+        self.search_method_combo.setItemText(1, _translate("AutoClickerApp", "OCR"))
+
+
+# SHA-256 of the gui.ui this module was generated from, checked by ui_mainwindow
+GUI_UI_SHA256 = "a5154066a0f8afa06b0520fd331e06bb1a7a5e9b8d58c5efe1a1936710b639c8"
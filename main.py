@@ -1,8 +1,10 @@
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
 from ui_mainwindow import AutoClickerApp
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # OCR worker processes in the frozen build
     app = QApplication(sys.argv)
     window = AutoClickerApp()
     window.show()
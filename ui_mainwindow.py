@@ -3,31 +3,75 @@ import platform
 import time
 import threading
 import json
+import queue
 import logging
+import hashlib
 import traceback
 import subprocess
 
-from PyQt6 import uic
-from PyQt6.QtWidgets import QWidget, QTextEdit, QApplication
+from PyQt6.QtWidgets import QWidget, QTextEdit
 from PyQt6.QtGui import QIcon, QTextCursor
-from PyQt6.QtCore import pyqtSignal, QObject
+from PyQt6.QtCore import pyqtSignal, QObject, QTimer
 from core.calibrator import CalibrationWorker
-from core.clicker import scan_for_phrase_and_click, scan_for_download_phrase_with_beep, find_and_handle_reference_images
+from core.roi import RoiTracker
 from core.logger import setup_logging, LOG_PATH, logger
-from core.utils import load_settings, save_settings, tesseract_found, success_beep
+from core.utils import load_settings, save_settings, load_roi_settings, load_ocr_settings, tesseract_found, success_beep
 from core.update_checker import UpdateChecker
 
+LOG_FLUSH_MS = 100          # How often queued log lines are written to the status widget
+MAX_STATUS_LINES = 2000     # Older lines are dropped from the status widget past this
+WARM_UP_DELAY_MS = 500      # Engine modules are preloaded this long after a search method is picked
+UI_FILE = "gui.ui"
+
+# uic logs every widget and property it sets at DEBUG level
+logging.getLogger("PyQt6.uic").setLevel(logging.WARNING)
+
+def load_ui(widget):
+    """
+    Build the widgets from gui.ui onto widget. Uses the gui_ui module
+    generated by build_ui.py while it matches gui.ui (or when gui.ui isn't
+    shipped), and parses gui.ui at runtime with uic.loadUi otherwise.
+    Returns "compiled" or "runtime".
+    """
+    try:
+        import gui_ui
+    except ImportError:
+        gui_ui = None
+    if gui_ui is not None:
+        if not os.path.exists(UI_FILE):
+            current = True
+        else:
+            with open(UI_FILE, "rb") as f:
+                current = getattr(gui_ui, "GUI_UI_SHA256", None) == hashlib.sha256(f.read()).hexdigest()
+        if current:
+            ui = gui_ui.Ui_AutoClickerApp()
+            ui.setupUi(widget)
+            # Expose the widgets as attributes of the window, as uic.loadUi does
+            for name, child in vars(ui).items():
+                setattr(widget, name, child)
+            return "compiled"
+        logger.warning("⚠️ gui_ui.py is out of date with gui.ui, loading gui.ui at runtime. Run build_ui.py to regenerate it.")
+    if not os.path.exists(UI_FILE):
+        raise FileNotFoundError("gui.ui not found in the current directory.")
+    from PyQt6 import uic
+    uic.loadUi(UI_FILE, widget)
+    return "runtime"
+
 class AutoClickerApp(QWidget):
     def __init__(self):
         super().__init__()
+        # Any thread may call log(); lines are queued here and drained on the GUI thread
+        self._log_queue = queue.SimpleQueue()
         try:
-            if not os.path.exists("gui.ui"):
-                raise FileNotFoundError("gui.ui not found in the current directory.")
-            uic.loadUi("gui.ui", self)
+            ui_source = load_ui(self)
+            self.status.document().setMaximumBlockCount(MAX_STATUS_LINES)
+            self._log_timer = QTimer(self)
+            self._log_timer.timeout.connect(self.flush_log)
+            self._log_timer.start(LOG_FLUSH_MS)
             self.setFixedSize(480, 320)
             if os.path.exists("assets/app_icon.ico"):
                 self.setWindowIcon(QIcon("app_icon.ico"))
-            self.log("✅ UI loaded successfully.")
+            self.log(f"✅ UI loaded successfully ({ui_source}).")
         except Exception as e:
             logger.error(f"❌ Failed to load UI: {e}\n{traceback.format_exc()}")
             self.log(f"🚨 UI load failed: {e}. Please ensure 'gui.ui' exists and is valid. Exiting...")
@@ -41,6 +85,7 @@ class AutoClickerApp(QWidget):
         self.search_method_combo.currentTextChanged.connect(self.on_search_method_changed)
 
         self.thread1 = self.thread2 = None
+        self.frame_bus = None
         self.stop_event = threading.Event()
         self.running = False
         self.search_method = self.search_method_combo.currentText()  # Initialize with default
@@ -56,19 +101,57 @@ class AutoClickerApp(QWidget):
         self.on_search_method_changed(self.search_method)
 
     def log(self, msg):
+        """Thread-safe: queue msg for the status widget; flush_log() writes it from the GUI thread."""
         timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
         full_msg = f"[{timestamp}] {msg}"
         logger.info(full_msg)
-        self.status.append(full_msg)
+        self._log_queue.put(full_msg)
+
+    def flush_log(self):
+        """Append every queued log line to the status widget in one batch. GUI thread only."""
+        lines = []
+        while True:
+            try:
+                lines.append(self._log_queue.get_nowait())
+            except queue.Empty:
+                break
+        if not lines:
+            return
+        # Only the most recent lines survive the block limit anyway
+        lines = lines[-MAX_STATUS_LINES:]
+        cursor = QTextCursor(self.status.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        for line in lines:
+            if not self.status.document().isEmpty():
+                cursor.insertBlock()
+            cursor.insertText(line)
+        cursor.endEditBlock()
         self.status.moveCursor(QTextCursor.MoveOperation.End)
-        QApplication.processEvents()
 
     def on_search_method_changed(self, method):
         self.search_method = method
         self.log(f"🔄 Search method changed to {method}")
+        # Delayed so the first window is painted before the heavy imports start
+        QTimer.singleShot(WARM_UP_DELAY_MS, lambda: self.warm_up_search_method(method))
         # Disable calibrate button if Image Search is selected
         self.btn_calibrate.setEnabled(method != "Image Search")
 
+    def warm_up_search_method(self, method):
+        """Import (and for OCR, load the model of) the selected engine in the background before Start is pressed."""
+        def warm_up():
+            try:
+                if method == "OCR":
+                    if not tesseract_found:
+                        return
+                    import core.frame_bus
+                    from core.ocr_engine import warm_up_ocr_engine
+                    warm_up_ocr_engine()
+                import core.clicker
+            except Exception as e:
+                logger.error(f"❌ Failed to preload {method} modules: {e}\n{traceback.format_exc()}")
+        threading.Thread(target=warm_up, daemon=True, name="WarmUpThread").start()
+
     def start_calibration(self):
         if hasattr(self, 'worker') and self.worker and threading.Thread(target=self.worker.run).is_alive():
             self.log("⚠️ Calibration already in progress. Please wait...")
@@ -100,25 +183,37 @@ class AutoClickerApp(QWidget):
             return
 
         self.log(f"▶️ Starting automation threads for position {self.button_position} on monitor {self.monitor} with {self.search_method}")
+        # Deferred so the window comes up without cv2/OCR/pyautogui loaded; usually preloaded by now
+        from core.clicker import scan_for_phrase_and_click, scan_for_download_phrase_with_beep, find_and_handle_reference_images
         self.running = True
         self.stop_event.clear()
         if self.search_method == "OCR":
+            from core.frame_bus import OcrFrameBus
+            # Both scanners share one capture + OCR pass per cycle. The download
+            # prompt can appear anywhere, so while it is watched the ROI box around
+            # the calibrated point is not applied and each pass covers the monitor
+            roi = RoiTracker(self.button_position, self.monitor, **load_roi_settings())
+            ocr_settings = load_ocr_settings()
+            self.frame_bus = OcrFrameBus(self.monitor, 10, self.log, self.stop_event, roi,
+                                         parallel_ocr=ocr_settings["parallel"],
+                                         text_regions=ocr_settings["text_regions"])
+            self.frame_bus.start()
             self.thread1 = threading.Thread(
                 target=scan_for_phrase_and_click,
-                args=(self.button_position, self.monitor, "PRESS TO CONTINUE PLAYING", 10, self.log, self.stop_event),
+                args=(self.button_position, self.monitor, "PRESS TO CONTINUE PLAYING", 10, self.log, self.stop_event, self.frame_bus),
                 daemon=True,
                 name="ClickScannerThread"
             )
             self.thread2 = threading.Thread(
                 target=scan_for_download_phrase_with_beep,
-                args=(self.monitor, "CLICK TO DOWNLOAD", 10, self.log, self.stop_event),
+                args=(self.monitor, "CLICK TO DOWNLOAD", 10, self.log, self.stop_event, self.frame_bus),
                 daemon=True,
                 name="DownloadBeepThread"
             )
         else:
             self.thread1 = threading.Thread(
                 target=find_and_handle_reference_images,
-                args=(self.log, self.stop_event, 0.8),
+                args=(self.log, self.stop_event, 0.8, 10),
                 daemon=True,
                 name="ImageScannerThread"
             )
@@ -136,6 +231,9 @@ class AutoClickerApp(QWidget):
                 self.thread1.join(timeout=5)
             if self.thread2:
                 self.thread2.join(timeout=5)
+            if self.frame_bus:
+                self.frame_bus.join(timeout=5)
+                self.frame_bus = None
             self.running = False
             self.log("✅ Threads terminated successfully.")
         else: